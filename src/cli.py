@@ -0,0 +1,308 @@
+# Headless command line interface for the solver and the generator (no pygame needed)
+
+from controller.generate import DEFAULT_CLUES, generate_board
+from controller.puzzle_io import format_puzzle, read_puzzles
+from controller.solver import SOLVERS
+from itertools import tee
+from model.grid import SIZE, SIZES, Board
+from typing import Iterator, List, Tuple
+import argparse
+import json
+import sys
+
+# The batch, cache, canonical, benchmark and service modules pull in multiprocessing, sqlite3
+# and asyncio, so each command imports the ones it needs to keep the others starting quickly
+
+UNSOLVABLE = "unsolvable"  # Written by solve in place of the solution of a puzzle that has none
+
+
+def read_input(path: str, skipped: List[int], sizes: Tuple[int] = SIZES) -> Iterator[Board]:
+    """
+    Function that reads the puzzles of a command's input, reporting every malformed line
+    (or board of a size the command does not handle) on stderr and skipping it instead of
+    stopping halfway through the output
+
+        Parameters:
+                path (str):           The puzzle file, '-' for stdin
+                skipped (list[int]):  The list the numbers of the skipped lines are added to
+                sizes (tuple[int]):   The board sizes the command handles
+
+        Returns:
+                (iterator[Grid]): The puzzles of the well formed lines
+    """
+    def report(lineno: int, message: str) -> None:
+        sys.stderr.write(f"line {lineno}: {message}, skipped\n")
+        skipped.append(lineno)
+
+    return read_puzzles(sys.stdin if path == "-" else path, compact=True, on_error=report, sizes=sizes)
+
+
+def solve_command(args: argparse.Namespace) -> int:
+    """
+    Command that solves every puzzle in the input and writes one solution per line, or
+    the word 'unsolvable' (which read_puzzles rejects) for puzzles with no solution
+
+        Parameters:
+                args (argparse.Namespace): The parsed command line arguments
+
+        Returns:
+                (int): The exit status (1 if any puzzle had no solution or a line was skipped)
+    """
+    from controller.batch import iter_solve
+
+    skipped = []
+    cache = None
+    if args.cache is not None:
+        from controller.cache import DEFAULT_MAX_ENTRIES, SolutionCache
+        size = DEFAULT_MAX_ENTRIES if args.cache_size is None else args.cache_size
+        cache = SolutionCache(args.cache, size, args.cache_canonical)
+    status = 0
+    try:
+        for _, board in iter_solve(read_input(args.input, skipped), args.workers, args.chunksize, args.engine,
+                                   cache=cache):
+            if board is None:
+                sys.stdout.write(UNSOLVABLE + "\n")
+                status = 1
+            else:
+                sys.stdout.write(format_puzzle(board) + "\n")
+    finally:
+        if cache is not None:
+            cache.close()
+            sys.stderr.write("cache: {hits} hits, {misses} misses, {size} entries\n".format(**cache.counters()))
+    return 1 if skipped else status
+
+
+def grade_command(args: argparse.Namespace) -> int:
+    """
+    Command that grades every puzzle in the input, writing the puzzle, the hardest
+    technique it needs and its score on each line (tab separated)
+
+        Parameters:
+                args (argparse.Namespace): The parsed command line arguments
+
+        Returns:
+                (int): The exit status (1 if a line was skipped)
+    """
+    from controller.batch import iter_grade
+
+    skipped = []
+    # The second copy of the input only buffers the boards the workers are ahead by
+    puzzles, boards = tee(read_input(args.input, skipped, (SIZE,)))  # The grader only knows 9x9 boards
+    results = zip(boards, (result for _, result in iter_grade(puzzles, args.workers, args.chunksize)))
+    if args.sort:
+        results = sorted(results, key=lambda item: (item[1].level, item[1].score))
+
+    for board, result in results:
+        sys.stdout.write(f"{format_puzzle(board)}\t{result.technique}\t{result.score}\n")
+    return 1 if skipped else 0
+
+
+def dedup_command(args: argparse.Namespace) -> int:
+    """
+    Command that writes the puzzles of the input that are not equivalent (by relabelling,
+    transposing or reordering rows and columns) to one written before
+
+        Parameters:
+                args (argparse.Namespace): The parsed command line arguments
+
+        Returns:
+                (int): The exit status (1 if a line was skipped)
+    """
+    from controller.canonical import canonical_form, dedup
+
+    skipped = []
+    for board in dedup(read_input(args.input, skipped, (SIZE,))):  # Canonical forms are only defined for 9x9
+        sys.stdout.write(format_puzzle(canonical_form(board) if args.canonical else board) + "\n")
+    return 1 if skipped else 0
+
+
+def screen_command(args: argparse.Namespace) -> int:
+    """
+    Command that screens the puzzles in bulk with NumPy, writing the puzzle after singles
+    propagation, its status (invalid, contradiction, solved or open) and its number of
+    givens on each line (tab separated)
+
+        Parameters:
+                args (argparse.Namespace): The parsed command line arguments
+
+        Returns:
+                (int): The exit status (1 if a line was skipped, 2 if NumPy is not installed)
+    """
+    try:
+        from controller.screen import iter_screen
+    except ImportError:
+        sys.stderr.write("screen needs NumPy (pip install numpy)\n")
+        return 2
+
+    skipped = []
+    for result in iter_screen(read_input(args.input, skipped, (SIZE,)), args.chunksize):  # 9x9 boards only
+        for i, board in enumerate(result.to_grids()):
+            if not result.valid[i]:
+                status = "invalid"
+            elif result.broken[i]:
+                status = "contradiction"
+            else:
+                status = "solved" if result.solved[i] else "open"
+            sys.stdout.write(f"{format_puzzle(board)}\t{status}\t{result.givens[i]}\n")
+    return 1 if skipped else 0
+
+
+def generate_command(args: argparse.Namespace) -> int:
+    """
+    Command that writes freshly generated puzzles, one per line
+
+        Parameters:
+                args (argparse.Namespace): The parsed command line arguments
+
+        Returns:
+                (int): The exit status
+    """
+    for i in range(args.count):
+        seed = None if args.seed is None else args.seed + i
+        board = generate_board(unique=not args.not_unique, clues=args.clues, seed=seed, size=args.size)
+        sys.stdout.write(format_puzzle(board) + "\n")
+    return 0
+
+
+def bench_command(args: argparse.Namespace) -> int:
+    """
+    Command that runs the benchmark suite and writes the results as JSON
+
+        Parameters:
+                args (argparse.Namespace): The parsed command line arguments
+
+        Returns:
+                (int): The exit status
+    """
+    from controller.benchmark import GROUPS, run_benchmarks
+
+    groups = GROUPS if args.groups is None else args.groups
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        sys.stderr.write(f"unknown puzzle group(s) {', '.join(unknown)}, expected some of {', '.join(GROUPS)}\n")
+        return 2
+
+    results = run_benchmarks(args.engines, groups, args.count, args.seed, not args.no_generator)
+    if args.output == "-":
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    """
+    Command that runs the HTTP/JSON solving service until interrupted
+
+        Parameters:
+                args (argparse.Namespace): The parsed command line arguments
+
+        Returns:
+                (int): The exit status
+    """
+    from controller.service import SolverService
+    import asyncio
+
+    # Options left out fall back to the service defaults
+    options = {name: getattr(args, name) for name in ("batch_size", "batch_window", "timeout", "max_nodes")}
+    service = SolverService(args.workers, **{name: value for name, value in options.items() if value is not None})
+    address = {name: getattr(args, name) for name in ("host", "port") if getattr(args, name) is not None}
+
+    async def run() -> None:
+        server = await service.start(**address)
+        host, port = server.sockets[0].getsockname()[:2]
+        sys.stderr.write(f"serving on http://{host}:{port}\n")
+        await service.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Function that builds the argument parser with all the subcommands
+
+        Returns:
+                (argparse.ArgumentParser): The parser for the sudopy command line
+    """
+    parser = argparse.ArgumentParser(prog="sudopy", description="Headless sudoku solver and generator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="solve puzzles given one per line (81 characters, '.' or '0' for blanks), "
+                                              f"writing '{UNSOLVABLE}' for puzzles with no solution")
+    solve.add_argument("input", nargs="?", default="-", help="puzzle file, '-' for stdin (default)")
+    solve.add_argument("--engine", choices=sorted(SOLVERS), default="bitmask", help="solver engine")
+    solve.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    solve.add_argument("--chunksize", type=int, default=256, help="puzzles sent to a worker at a time")
+    solve.add_argument("--cache", default=None, help="SQLite file caching solutions across runs")
+    solve.add_argument("--cache-size", type=int, default=None, help="puzzles kept in the cache (default 1000000)")
+    solve.add_argument("--cache-canonical", action="store_true",
+                       help="share one cache entry between equivalent puzzles (the cache file must always use it)")
+    solve.set_defaults(func=solve_command)
+
+    grade = commands.add_parser("grade", help="grade puzzles by the hardest solving technique they need")
+    grade.add_argument("input", nargs="?", default="-", help="puzzle file, '-' for stdin (default)")
+    grade.add_argument("--sort", action="store_true", help="write the puzzles from easiest to hardest")
+    grade.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    grade.add_argument("--chunksize", type=int, default=256, help="puzzles sent to a worker at a time")
+    grade.set_defaults(func=grade_command)
+
+    dedup_parser = commands.add_parser("dedup", help="drop puzzles equivalent to an earlier one under the sudoku symmetries")
+    dedup_parser.add_argument("input", nargs="?", default="-", help="puzzle file, '-' for stdin (default)")
+    dedup_parser.add_argument("--canonical", action="store_true", help="write the canonical form of each puzzle")
+    dedup_parser.set_defaults(func=dedup_command)
+
+    screen = commands.add_parser("screen", help="check and propagate large batches of puzzles at once (needs NumPy)")
+    screen.add_argument("input", nargs="?", default="-", help="puzzle file, '-' for stdin (default)")
+    screen.add_argument("--chunksize", type=int, default=65536, help="puzzles screened at a time")
+    screen.set_defaults(func=screen_command)
+
+    generate = commands.add_parser("generate", help="generate puzzles, one per line")
+    generate.add_argument("-n", "--count", type=int, default=1, help="number of puzzles to generate")
+    generate.add_argument("--clues", type=int, default=None,
+                          help=f"number of clues left on each board (default {DEFAULT_CLUES} for 9x9)")
+    generate.add_argument("--size", type=int, choices=SIZES, default=SIZE, help="number of rows and columns")
+    generate.add_argument("--seed", type=int, default=None, help="seed of the first puzzle (incremented for the rest)")
+    generate.add_argument("--not-unique", action="store_true", help="allow puzzles with more than one solution")
+    generate.set_defaults(func=generate_command)
+
+    serve = commands.add_parser("serve", help="run the HTTP/JSON service (/solve, /generate, /validate, /count)")
+    serve.add_argument("--host", default=None, help="address to listen on (default 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=None, help="port to listen on (default 8765)")
+    serve.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    serve.add_argument("--batch-size", type=int, default=None,
+                       help="largest number of requests dispatched together (default 32)")
+    serve.add_argument("--batch-window", type=float, default=None,
+                       help="seconds waited for more requests before dispatching a batch (default 0.002)")
+    serve.add_argument("--timeout", type=float, default=None, help="largest number of seconds per request (default 5)")
+    serve.add_argument("--max-nodes", type=int, default=None,
+                       help="largest search budget per request (default 2000000)")
+    serve.set_defaults(func=serve_command)
+
+    bench = commands.add_parser("bench", help="benchmark the solver engines and the generator, results as JSON")
+    bench.add_argument("-n", "--count", type=int, default=100, help="number of puzzles per group")
+    bench.add_argument("--seed", type=int, default=0, help="seed the puzzle sets are derived from")
+    bench.add_argument("--engines", nargs="+", choices=sorted(SOLVERS), default=["bitmask", "dlx"],
+                       help="solver engines to run (backtrack is very slow outside the easy group)")
+    bench.add_argument("--groups", nargs="+", default=None,
+                       help="puzzle groups to run: easy, hard, 17-clue, anti-backtracking (default all)")
+    bench.add_argument("--no-generator", action="store_true", help="skip the generator benchmark")
+    bench.add_argument("-o", "--output", default="-", help="file to write the JSON results to, '-' for stdout")
+    bench.set_defaults(func=bench_command)
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    """Client function that runs the command line interface"""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# Helper functions used to solve large numbers of sudoku boards across several processes
+
+from controller.cache import SolutionCache
+from controller.grader import Grade, grade
+from controller.solver import solve
+from model.grid import Board, Grid
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+DEFAULT_CHUNKSIZE = 256  # Boards sent to a worker at a time
+
+
+def solve_many(puzzles: Iterable[Board], workers: int = None, chunksize: int = DEFAULT_CHUNKSIZE,
+               engine: str = "bitmask", cache: SolutionCache = None) -> List[Board]:
+    """
+    Function that solves a batch of boards on a pool of worker processes
+
+        Parameters:
+                puzzles (iterable[Grid | list[int][int]]): The boards to solve (left untouched), Grids
+                                                          are the cheapest to send to the workers
+                workers (int):    The number of worker processes (defaults to the number of cores)
+                chunksize (int):  The number of boards handed to a worker at a time
+                engine (str):     The name of the solver engine to use
+                cache (SolutionCache): Optional cache looked up before solving and filled afterwards
+
+        Returns:
+                (list[Grid | list[int][int]]): The solved boards in input order, None for unsolvable boards
+    """
+    return [board for _, board in iter_solve(puzzles, workers, chunksize, engine, ordered=True, cache=cache)]
+
+
+def iter_solve(puzzles: Iterable[Board], workers: int = None, chunksize: int = DEFAULT_CHUNKSIZE,
+               engine: str = "bitmask", ordered: bool = True, cache: SolutionCache = None) -> Iterator[Tuple[int, Board]]:
+    """
+    Generator that solves a batch of boards on a pool of worker processes, yielding
+    each result as soon as it is available
+
+        Parameters:
+                puzzles (iterable[Grid | list[int][int]]): The boards to solve (left untouched), Grids
+                                                          are the cheapest to send to the workers
+                workers (int):    The number of worker processes (defaults to the number of cores),
+                                  1 solves in the calling process
+                chunksize (int):  The number of boards handed to a worker at a time
+                engine (str):     The name of the solver engine to use
+                ordered (bool):   Whether results come out in input order or as they finish
+                cache (SolutionCache): Optional cache looked up before solving (in the calling process),
+                                       with the solutions of the misses added to it
+
+        Yields:
+                (tuple[int, Grid | list[int][int]]): The index of the board in the input and the solved
+                                                     board, None if it has no solution
+    """
+    if cache is None:
+        tasks = ((i, board, engine) for i, board in enumerate(puzzles))
+        yield from _run(_solve_task, tasks, workers, chunksize, ordered)
+        return
+
+    misses = {}  # Boards sent to the workers, by index, until their solution comes back
+
+    def lookup() -> Iterator[Tuple[int, Board, str]]:
+        for i, board in enumerate(puzzles):
+            found, solution = cache.get(board)
+            if found:
+                yield i, solution, None  # Passed through the workers so results keep their order
+            else:
+                misses[i] = board
+                yield i, board, engine
+
+    for i, board in _run(_solve_task, lookup(), workers, chunksize, ordered):
+        if i in misses:
+            cache.put(misses.pop(i), board)
+        yield i, board
+
+
+def iter_grade(puzzles: Iterable[Board], workers: int = None, chunksize: int = DEFAULT_CHUNKSIZE,
+               ordered: bool = True) -> Iterator[Tuple[int, Grade]]:
+    """
+    Generator that grades a batch of boards on a pool of worker processes, yielding
+    each result as soon as it is available
+
+        Parameters:
+                puzzles (iterable[Grid | list[int][int]]): The boards to grade
+                workers (int):    The number of worker processes (defaults to the number of cores),
+                                  1 grades in the calling process
+                chunksize (int):  The number of boards handed to a worker at a time
+                ordered (bool):   Whether results come out in input order or as they finish
+
+        Yields:
+                (tuple[int, Grade]): The index of the board in the input and its grade
+    """
+    yield from _run(_grade_task, enumerate(puzzles), workers, chunksize, ordered)
+
+
+def _run(func: Callable[[tuple], tuple], tasks: Iterable[tuple], workers: int, chunksize: int,
+         ordered: bool) -> Iterator[tuple]:
+    """
+    Helper generator that maps a task function over the tasks, in the calling process
+    when workers is 1 and on a pool of worker processes otherwise
+
+        Parameters:
+                func (callable):      The function run on every task (must be picklable)
+                tasks (iterable):     The tasks, fed to the pool lazily
+                workers (int):        The number of worker processes (None for the number of cores)
+                chunksize (int):      The number of tasks handed to a worker at a time
+                ordered (bool):       Whether results come out in input order or as they finish
+
+        Yields:
+                (tuple): The result of every task
+    """
+    if workers == 1:
+        yield from map(func, tasks)
+        return
+
+    from multiprocessing import Pool  # Only paid for by callers that use workers
+    with Pool(workers) as pool:
+        if ordered:
+            yield from pool.imap(func, tasks, chunksize)
+        else:
+            yield from pool.imap_unordered(func, tasks, chunksize)
+
+
+def _solve_task(task: Tuple[int, Board, str]) -> Tuple[int, Board]:
+    """
+    Helper function run by the workers to solve a single board
+
+        Parameters:
+                task (tuple): The index of the board, the board and the engine name (None if
+                              the board is a cached solution, or None for a cached unsolvable board)
+
+        Returns:
+                (tuple[int, Grid | list[int][int]]): The index and the solved board, None if it has no solution
+    """
+    i, board, engine = task
+    if engine is None:
+        return i, board
+
+    board = board.copy() if isinstance(board, Grid) else [list(row) for row in board]
+    return i, (board if solve(board, engine) else None)
+
+
+def _grade_task(task: Tuple[int, Board]) -> Tuple[int, Grade]:
+    """
+    Helper function run by the workers to grade a single board
+
+        Parameters:
+                task (tuple): The index of the board and the board
+
+        Returns:
+                (tuple[int, Grade]): The index and the grade of the board
+    """
+    i, board = task
+    return i, grade(board)
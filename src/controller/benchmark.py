@@ -0,0 +1,364 @@
+# Benchmark suite for the solver engines and the generator over reproducible puzzle sets
+
+from controller.budget import Budget, BudgetExceeded
+from controller.canonical import canonical_form
+from controller.generate import generate_board, random_solution, shuffle_grid
+from controller.puzzle_io import parse_puzzle
+from controller.solver import check_valid, is_consistent, solve
+from controller.stats import SolveStats
+from itertools import permutations, product
+from model.grid import CELLS, Grid
+from operator import itemgetter
+from random import Random
+from typing import Dict, List
+import platform
+import subprocess
+import time
+import tracemalloc
+
+# Known puzzles with the minimum number of clues (17), all with a unique solution
+SEVENTEEN_CLUES = (
+    "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+    "000000010400000000020000000000050604008000300001090000300400200050100000000807000",
+    "000000012000035000000600070700000300000400800100000000000120000080000040050000600",
+    "000000012003600000000007000410020000000500300700000600280000040000300500000000000",
+    "000000012008030000000000040120500000000004700060000000507000300000620000000100000",
+    "000000013000030080070000000000206000030000900000010000600500204000400700100000000",
+    "000000013000500070000802000000400900107000000000000200890000050040000600000010000",
+)
+
+# Puzzle built against row-major brute force: the first row of its solution is 987654321,
+# so trying the digits in increasing order backtracks as much as possible
+ANTI_BACKTRACKING = (
+    "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+)
+
+GROUPS = ("easy", "hard", "17-clue", "anti-backtracking")
+
+MEMORY_SAMPLE = 10  # Tracing allocations is slow, so peak memory is measured on the first few runs only
+SOLUTION_SEEDS = 300  # Complete 16x16 grids built, enough to run into the slow seeds of the search
+SOLUTION_TIMEOUT = 5.0  # Seconds a single grid may take before the run counts as a regression
+
+# Every order of the rows (or columns) that keeps bands (or stacks) together, 6^4 of them
+_LINE_ORDERS = tuple(itemgetter(*(bands[i] * 3 + within[i][j] for i in range(3) for j in range(3)))
+                     for bands in permutations(range(3)) for within in product(permutations(range(3)), repeat=3))
+_LABELS = bytes(range(1, 10))
+
+
+def build_corpus(group: str, count: int, seed: int = 0) -> List[List[List[int]]]:
+    """
+    Function that builds the same set of puzzles for a difficulty group on every run
+
+        Parameters:
+                group (str): One of GROUPS
+                count (int): The number of puzzles in the set
+                seed (int):  The seed the set is derived from
+
+        Returns:
+                (list[list[int][int]]): The puzzles of the set
+    """
+    if group == "easy":
+        return [generate_board(clues=36, seed=seed + i) for i in range(count)]
+    elif group == "hard":
+        # The digger stops early on boards with no removable clue left, so these keep 22-28
+        # clues (see the clue counts of the group in the results)
+        return [generate_board(clues=22, seed=seed + i) for i in range(count)]
+    elif group == "17-clue":
+        # Shuffled copies of the known puzzles keep their clue count and unique solution
+        return [shuffle_grid(parse_puzzle(SEVENTEEN_CLUES[i % len(SEVENTEEN_CLUES)]), Random(seed + i))
+                for i in range(count)]
+    elif group == "anti-backtracking":
+        # Shuffling would undo the point of these puzzles, so they are repeated as they are
+        return [parse_puzzle(ANTI_BACKTRACKING[i % len(ANTI_BACKTRACKING)]) for i in range(count)]
+
+    raise ValueError(f"Unknown puzzle group '{group}', expected one of {', '.join(GROUPS)}")
+
+
+def bench_solver(engine: str, puzzles: List[List[List[int]]]) -> Dict[str, float]:
+    """
+    Function that times a solver engine over a set of puzzles
+
+        Parameters:
+                engine (str):                      The name of the solver engine
+                puzzles (list[list[int][int]]):    The puzzles to solve (left untouched)
+
+        Returns:
+                (dict): Throughput, latency percentiles (ms), search node counts and peak memory (KiB)
+    """
+    latencies = []
+    nodes = []
+    solved = 0
+    for puzzle in puzzles:
+        board = [row[:] for row in puzzle]
+        stats = SolveStats()
+        start = time.perf_counter()
+        solved += solve(board, engine, stats)
+        latencies.append(time.perf_counter() - start)
+        nodes.append(stats.nodes)
+
+    # Memory is traced in a separate pass so that tracing does not skew the timings
+    tracemalloc.start()
+    for puzzle in puzzles[:MEMORY_SAMPLE]:
+        solve([row[:] for row in puzzle], engine)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        "puzzles": len(puzzles),
+        "solved": solved,
+        "seconds": total,
+        "puzzles_per_sec": len(puzzles) / total if total else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        # Placements tried by the search: backtrack and bitmask fill in singles before searching
+        # and do not count them (0 nodes when that solves the board), dlx counts every placement
+        "search_nodes_total": sum(nodes),
+        "search_nodes_mean": sum(nodes) / len(nodes) if nodes else 0.0,
+        "search_nodes_max": max(nodes, default=0),
+        "peak_kib": peak / 1024,
+    }
+
+
+def bench_generator(count: int, seed: int = 0) -> Dict[str, float]:
+    """
+    Function that times generate_board over a range of seeds
+
+        Parameters:
+                count (int): The number of boards to generate
+                seed (int):  The seed of the first board
+
+        Returns:
+                (dict): Throughput, latency percentiles (ms), peak memory (KiB) and clue counts
+    """
+    latencies = []
+    boards = []
+    for i in range(count):
+        start = time.perf_counter()
+        boards.append(generate_board(seed=seed + i))
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for i in range(min(count, MEMORY_SAMPLE)):
+        generate_board(seed=seed + i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        "boards": count,
+        "seconds": total,
+        "boards_per_sec": count / total if total else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "peak_kib": peak / 1024,
+        **_clue_counts(boards),
+    }
+
+
+def bench_solutions(seed: int = 0, size: int = 16) -> Dict[str, float]:
+    """
+    Function that times random_solution over SOLUTION_SEEDS seeds on a large board, where
+    a few random starting grids used to take the completing search millions of nodes
+
+        Parameters:
+                seed (int): The seed of the first grid
+                size (int): The number of rows and columns
+
+        Returns:
+                (dict): Throughput and latency percentiles (ms), and the slowest grid (ms)
+    """
+    latencies = []
+    for i in range(SOLUTION_SEEDS):
+        stats = SolveStats(budget=Budget(timeout=SOLUTION_TIMEOUT))
+        start = time.perf_counter()
+        try:
+            grid = random_solution(Random(seed + i), size, stats)
+        except BudgetExceeded:
+            raise AssertionError(f"random_solution took over {SOLUTION_TIMEOUT}s with seed {seed + i}") from None
+        latencies.append(time.perf_counter() - start)
+        if 0 in grid or not is_consistent(grid):
+            raise AssertionError(f"random_solution returned an invalid grid with seed {seed + i}")
+
+    total = sum(latencies)
+    return {
+        "size": size,
+        "grids": SOLUTION_SEEDS,
+        "seconds": total,
+        "grids_per_sec": SOLUTION_SEEDS / total if total else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def bench_canonical(count: int, seed: int = 0) -> Dict[str, float]:
+    """
+    Function that times canonical_form over generated puzzles, and over the sparse boards
+    (the empty board, a single row and a single band of clues) that used to make the
+    search blow up. The forms of a shuffled generated puzzle and of the two sparse boards
+    with clues are checked against a brute force search (about 15 s each).
+
+        Parameters:
+                count (int): The number of generated puzzles
+                seed (int):  The seed of the first puzzle
+
+        Returns:
+                (dict): Throughput and latency percentiles (ms) on the puzzles, and the slowest
+                        sparse board (ms)
+    """
+    latencies = []
+    for i in range(count):
+        board = generate_board(seed=seed + i, compact=True)
+        start = time.perf_counter()
+        canonical_form(board)
+        latencies.append(time.perf_counter() - start)
+
+    solution = generate_board(seed=seed, clues=CELLS, compact=True)
+    sparse = [Grid(), Grid(bytes(36) + solution[36:45] + bytes(36)), Grid(bytes(27) + solution[27:54] + bytes(27))]
+    sparse_latencies, forms = [], []
+    for board in sparse:
+        start = time.perf_counter()
+        forms.append(canonical_form(board))
+        sparse_latencies.append(time.perf_counter() - start)
+    if any(forms[0]):
+        raise AssertionError("The canonical form of the empty board must be the empty board")
+    puzzle = generate_board(seed=seed, clues=30, compact=True)
+    for board, form in ((puzzle, canonical_form(shuffle_grid(puzzle, Random(seed)))), *zip(sparse[1:], forms[1:])):
+        if bytes(form) != _brute_force_form(board):
+            raise AssertionError(f"canonical_form is not the smallest equivalent board of {bytes(board).hex()}")
+
+    total = sum(latencies)
+    return {
+        "puzzles": count,
+        "seconds": total,
+        "puzzles_per_sec": count / total if total else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "sparse_max_ms": max(sparse_latencies) * 1000,
+    }
+
+
+def bench_check_valid(count: int, seed: int = 0) -> Dict[str, float]:
+    """
+    Function that times check_valid by checking every given of generated puzzles against
+    the rest of the board, the way a board is screened one cell at a time
+
+        Parameters:
+                count (int): The number of generated puzzles
+                seed (int):  The seed of the first puzzle
+
+        Returns:
+                (dict): Throughput (boards and checks) and latency percentiles (ms) per board
+    """
+    latencies = []
+    checks = 0
+    for i in range(count):
+        board = generate_board(seed=seed + i, compact=True)
+        givens = [(pos, num) for pos, num in enumerate(board) if num]
+        start = time.perf_counter()
+        for pos, num in givens:
+            board[pos] = 0
+            if not check_valid(board, num, divmod(pos, 9)):
+                raise AssertionError(f"Given {num} at position {pos} of a generated puzzle reported invalid")
+            board[pos] = num
+        latencies.append(time.perf_counter() - start)
+        checks += len(givens)
+
+    total = sum(latencies)
+    return {
+        "boards": count,
+        "checks": checks,
+        "seconds": total,
+        "boards_per_sec": count / total if total else 0.0,
+        "checks_per_sec": checks / total if total else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+def run_benchmarks(engines: List[str], groups: List[str] = GROUPS, count: int = 100, seed: int = 0,
+                   generator: bool = True) -> dict:
+    """
+    Function that runs every engine over every puzzle group and collects the results
+    in a JSON serialisable dictionary, so runs can be compared across commits
+
+        Parameters:
+                engines (list[str]): The solver engines to benchmark
+                groups (list[str]):  The puzzle groups to run them on
+                count (int):         The number of puzzles (and generated boards) per group
+                seed (int):          The seed the puzzle sets are derived from
+                generator (bool):    Whether to benchmark generate_board too
+
+        Returns:
+                (dict): The environment, the clue counts of every group and the results of every run
+    """
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "count": count,
+            "seed": seed,
+        },
+        "groups": {},
+        "solvers": [],
+    }
+
+    for group in groups:
+        puzzles = build_corpus(group, count, seed)
+        results["groups"][group] = _clue_counts(puzzles)
+        for engine in engines:
+            results["solvers"].append({"engine": engine, "group": group, **bench_solver(engine, puzzles)})
+
+    if generator:
+        results["generator"] = bench_generator(count, seed)
+        results["solutions"] = bench_solutions(seed)
+    results["canonical"] = bench_canonical(count, seed)
+    results["check_valid"] = bench_check_valid(count, seed)
+
+    return results
+
+
+def _clue_counts(puzzles: List[List[List[int]]]) -> Dict[str, float]:
+    """Helper function that returns the smallest, mean and largest number of clues of a set of puzzles"""
+    clues = [sum(1 for row in puzzle for num in row if num) for puzzle in puzzles]
+    if not clues:
+        return {"clues_min": 0, "clues_mean": 0.0, "clues_max": 0}
+    return {"clues_min": min(clues), "clues_mean": sum(clues) / len(clues), "clues_max": max(clues)}
+
+
+def _brute_force_form(b: Grid) -> bytes:
+    """Helper function that finds the smallest equivalent board by trying all 2 * 6^8 row and column orders"""
+    cells = bytes(b)
+    transposed = bytes(cells[c * 9 + r] for r in range(9) for c in range(9))
+    best = b"\xff"
+    for grid in (cells, transposed):
+        rows = [grid[r * 9:r * 9 + 9] for r in range(9)]
+        for cols in _LINE_ORDERS:
+            moved = [bytes(cols(row)) for row in rows]
+            for order in _LINE_ORDERS:
+                board = b"".join(order(moved))
+                digits = bytes(dict.fromkeys(board.replace(b"\0", b"")))  # In order of first appearance
+                out = board.translate(bytes.maketrans(digits, _LABELS[:len(digits)]))
+                if out < best:
+                    best = out
+    return best
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Helper function that returns the nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def _git_commit() -> str:
+    """Helper function that returns the current git commit, or None outside of a checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,120 @@
+# Time, node and cancellation limits for the solver and generator calls
+
+from threading import Event
+import time
+
+CHECK_EVERY = 128  # Search nodes between two looks at the clock and the cancellation token
+
+
+class BudgetExceeded(Exception):
+    """
+    Exception raised by a solver or generator call that ran out of budget before finishing.
+    The board passed to the call is left as it was.
+
+    Attributes
+    ----------
+    reason : str
+        "timeout", "max_nodes" or "cancelled"
+    nodes : int
+        the number of search nodes used before giving up
+    """
+
+    def __init__(self, reason: str, nodes: int) -> None:
+        super().__init__(f"Budget exceeded ({reason}) after {nodes} nodes")
+        self.reason = reason
+        self.nodes = nodes
+
+
+class CancelToken:
+    """
+    Class modelling a flag another thread can raise to stop a running solver or
+    generator call at its next check
+
+    Methods
+    -------
+    cancel():
+        asks the calls using the token to stop
+    """
+
+    def __init__(self) -> None:
+        self._event = Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Function that asks the calls using the token to stop"""
+        self._event.set()
+
+
+class Budget:
+    """
+    Class modelling the limits of a single solver or generator call. The engines charge
+    it for every search node; the clock and the token are looked at every CHECK_EVERY
+    nodes, and also between the attempts of the generator.
+
+    Attributes
+    ----------
+    deadline : float
+        the time.monotonic() after which the call gives up, None for no time limit
+    max_nodes : int
+        the number of search nodes after which the call gives up, None for no limit
+    cancel : CancelToken
+        optional token that stops the call when cancelled
+    nodes : int
+        the number of search nodes charged so far
+
+    Methods
+    -------
+    charge():
+        counts a search node, raising BudgetExceeded when a limit is reached
+    check():
+        raises BudgetExceeded if the time is up or the call was cancelled
+    """
+
+    def __init__(self, timeout: float = None, max_nodes: int = None, cancel: CancelToken = None) -> None:
+        """
+        Constructor function that starts the clock of the budget
+
+            Parameters:
+                    timeout (float):     Seconds the call may take, None for no time limit
+                    max_nodes (int):     Search nodes the call may use, None for no limit
+                    cancel (CancelToken): Optional token that stops the call when cancelled
+        """
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.max_nodes = max_nodes
+        self.cancel = cancel
+        self.nodes = 0
+
+    def charge(self) -> None:
+        """Function that counts a search node, raising BudgetExceeded when a limit is reached"""
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise BudgetExceeded("max_nodes", self.nodes)
+        if self.nodes % CHECK_EVERY == 0:
+            self.check()
+
+    def check(self) -> None:
+        """Function that raises BudgetExceeded if the time is up or the call was cancelled"""
+        if self.cancel is not None and self.cancel.cancelled:
+            raise BudgetExceeded("cancelled", self.nodes)
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded("timeout", self.nodes)
+
+
+def make_budget(timeout: float = None, max_nodes: int = None, cancel: CancelToken = None) -> Budget:
+    """
+    Function that builds the budget of a call from its keyword arguments
+
+        Parameters:
+                timeout (float):      Seconds the call may take, None for no time limit
+                max_nodes (int):      Search nodes the call may use, None for no limit
+                cancel (CancelToken): Optional token that stops the call when cancelled
+
+        Returns:
+                (Budget): The budget, None when no limit was given (so unlimited calls pay nothing)
+    """
+    if timeout is None and max_nodes is None and cancel is None:
+        return None
+    return Budget(timeout, max_nodes, cancel)
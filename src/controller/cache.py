@@ -0,0 +1,199 @@
+# Persistent solution cache, so boards that were solved before are only looked up
+
+from controller.canonical import Transform, canonicalize
+from controller.puzzle_io import format_puzzle, parse_puzzle
+from controller.solver import solve
+from controller.stats import SolveStats
+from model.grid import SIZE, Board, Grid, size_of, store_cells
+from os import PathLike
+from threading import Lock
+from typing import Dict, Tuple, Union
+import sqlite3
+
+DEFAULT_MAX_ENTRIES = 1_000_000  # Boards kept before the least recently used ones are evicted
+COMMIT_EVERY = 1000  # Writes between commits (the rest are committed on close)
+
+
+class SolutionCache:
+    """
+    Class modelling a size bounded, least recently used cache of solutions kept in an
+    SQLite database. Boards are keyed by their 81 character form (or that of their
+    canonical form, so equivalent boards share one entry), and boards without a
+    solution are remembered too. The cache can be shared by several threads.
+
+    Attributes
+    ----------
+    path : str
+        the path of the database file (":memory:" for a cache that is not persisted)
+    max_entries : int
+        the number of boards kept before the least recently used ones are evicted
+    canonical : bool
+        whether or not boards are keyed by their canonical form
+    hits : int
+        the number of lookups answered by the cache since it was opened
+    misses : int
+        the number of lookups that were not in the cache since it was opened
+
+    Methods
+    -------
+    get(b):
+        looks a board up in the cache
+    put(b, solution):
+        stores the solution of a board
+    solve(b, engine, stats):
+        solves a board in place, going to the solver only on a miss
+    counters():
+        returns the hit, miss and size counters
+    close():
+        commits pending writes and closes the database
+    """
+
+    def __init__(self, path: Union[str, PathLike], max_entries: int = DEFAULT_MAX_ENTRIES,
+                 canonical: bool = False) -> None:
+        """
+        Constructor function that opens (or creates) the cache database
+
+            Parameters:
+                    path (str | PathLike): The path of the database file
+                    max_entries (int):     The number of boards kept before evicting
+                    canonical (bool):      Key boards by their canonical form (a few milliseconds per
+                                           lookup, a database must always be opened the same way)
+        """
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.canonical = canonical
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._pending = 0
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS solutions "
+                         "(puzzle TEXT PRIMARY KEY, solution TEXT, used INTEGER NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)")
+        self._size, last_used = self._db.execute("SELECT COUNT(*), MAX(used) FROM solutions").fetchone()
+        self._clock = last_used or 0  # Increases on every access, the smallest value is evicted first
+        self._evict()  # The cache may have been opened with a smaller size before
+        self._db.commit()
+
+    def get(self, b: Board) -> Tuple[bool, Grid]:
+        """
+        Function that looks a board up in the cache
+
+            Parameters:
+                    b (Grid | list[int][int]): The sudoku board
+
+            Returns:
+                    (tuple[bool, Grid]): Whether or not the board was in the cache, and its solution
+                                         (None on a miss or if the board has no solution)
+        """
+        return self._get(*self._key(b))
+
+    def put(self, b: Board, solution: Board) -> None:
+        """
+        Function that stores the solution of a board, evicting the least recently used
+        boards if the cache is full
+
+            Parameters:
+                    b (Grid | list[int][int]):        The sudoku board
+                    solution (Grid | list[int][int]): Its solution, None if it has none
+        """
+        self._put(*self._key(b), solution)
+
+    def solve(self, b: Board, engine: str = "bitmask", stats: SolveStats = None) -> bool:
+        """
+        Function that solves a board in place like controller.solver.solve, but only runs
+        the solver if the board is not in the cache yet
+
+            Parameters:
+                    b (Grid | list[int][int]): The incomplete sudoku board
+                    engine (str):              The name of the engine to use on a miss
+                    stats (SolveStats):        Optional object where the search statistics are added up
+
+            Returns:
+                    True/False (boolean): Whether or not the board was solved (filled in place)
+        """
+        key, transform = self._key(b)  # Worked out once for both the lookup and the store
+        found, solution = self._get(key, transform)
+        if found:
+            if solution is None:
+                return False
+            store_cells(b, solution)
+            return True
+
+        solved = solve(b, engine, stats)
+        self._put(key, transform, b if solved else None)
+        return solved
+
+    def counters(self) -> Dict[str, int]:
+        """
+        Function that returns the counters of the cache
+
+            Returns:
+                    (dict): The hits, misses, current size and maximum size
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": self._size, "max_entries": self.max_entries}
+
+    def close(self) -> None:
+        """Function that commits the pending writes and closes the database"""
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def __enter__(self) -> "SolutionCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _key(self, b: Board) -> Tuple[str, Transform]:
+        """Helper function that returns the key of a board and the transform to its canonical form (None if not canonical)"""
+        if not self.canonical or size_of(b) != SIZE:  # Only 9x9 boards have canonical forms
+            return format_puzzle(b), None
+        form, transform = canonicalize(b)
+        return format_puzzle(form), transform
+
+    def _get(self, key: str, transform: Transform) -> Tuple[bool, Grid]:
+        """Helper function that looks a key up, mapping the stored solution back through the transform"""
+        with self._lock:
+            row = self._db.execute("SELECT solution FROM solutions WHERE puzzle = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+
+            self.hits += 1
+            self._clock += 1
+            self._db.execute("UPDATE solutions SET used = ? WHERE puzzle = ?", (self._clock, key))
+            self._written()
+
+        if row[0] is None:
+            return True, None
+        solution = parse_puzzle(row[0], compact=True)
+        return True, (solution if transform is None else transform.invert(solution))
+
+    def _put(self, key: str, transform: Transform, solution: Board) -> None:
+        """Helper function that stores the solution of a key, in canonical form if there is a transform"""
+        if solution is not None and transform is not None:
+            solution = transform.apply(solution)
+        value = None if solution is None else format_puzzle(solution)
+        with self._lock:
+            self._clock += 1
+            added = self._db.execute("INSERT OR IGNORE INTO solutions VALUES (?, ?, ?)",
+                                     (key, value, self._clock)).rowcount
+            self._size += added
+            self._evict()
+            self._written()
+
+    def _evict(self) -> None:
+        """Helper function that drops the least recently used boards above max_entries (called with the lock held)"""
+        if self._size > self.max_entries:
+            excess = self._size - self.max_entries
+            self._db.execute("DELETE FROM solutions WHERE puzzle IN "
+                             "(SELECT puzzle FROM solutions ORDER BY used LIMIT ?)", (excess,))
+            self._size -= excess
+
+    def _written(self) -> None:
+        """Helper function that commits once every COMMIT_EVERY writes (called with the lock held)"""
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self._db.commit()
+            self._pending = 0
@@ -0,0 +1,312 @@
+# Canonical form of a board under the validity preserving symmetries, used to deduplicate puzzles
+
+from itertools import permutations, product
+from operator import itemgetter
+from model.grid import CELLS, Board, Grid, cells_of
+from typing import Iterable, Iterator, List, Tuple
+
+_TRIPLES = tuple(permutations(range(3)))
+_TRANSPOSED = tuple(c * 9 + r for r in range(9) for c in range(9))  # Flat position of each cell after transposing
+_NEW = 255  # Label of the digits not seen yet
+_MERGE_ABOVE = 4096  # Candidates kept before the ones leading to the same rows are merged
+_EMPTY_TABLE = bytes([0] + [_NEW] * 9 + [0] * 246)
+
+
+class Transform:
+    """
+    Class modelling one of the symmetries of the sudoku board: an optional transposition,
+    then a reordering of the rows and the columns (keeping bands and stacks together)
+    and a relabelling of the digits. Clue count and number of solutions do not change.
+
+    Attributes
+    ----------
+    transpose : bool
+        whether or not the board is transposed first
+    rows : tuple[int]
+        the row of the (transposed) board that ends up in each row
+    cols : tuple[int]
+        the column of the (transposed) board that ends up in each column
+    digits : bytes
+        the new label of every digit (index 0 stays 0)
+
+    Methods
+    -------
+    apply(b):
+        maps a board to its transformed form
+    invert(b):
+        maps a transformed board back
+    """
+
+    def __init__(self, transpose: bool, rows: Tuple[int], cols: Tuple[int], digits: bytes) -> None:
+        self.transpose = transpose
+        self.rows = tuple(rows)
+        self.cols = tuple(cols)
+        self.digits = bytes(digits)
+
+    def apply(self, b: Board) -> Grid:
+        """
+        Function that applies the transform to a board
+
+            Parameters:
+                    b (Grid | list[int][int]): The sudoku board
+
+            Returns:
+                    (Grid): The transformed board
+        """
+        cells = cells_of(b)
+        if self.transpose:
+            cells = bytes(cells[p] for p in _TRANSPOSED)
+        digits = self.digits
+        return Grid(digits[cells[r * 9 + c]] for r in self.rows for c in self.cols)
+
+    def invert(self, b: Board) -> Grid:
+        """
+        Function that undoes the transform, e.g. to map the solution of a canonical board
+        back to the board it came from
+
+            Parameters:
+                    b (Grid | list[int][int]): The transformed sudoku board
+
+            Returns:
+                    (Grid): The board before the transform
+        """
+        cells = cells_of(b)
+        labels = bytearray(10)
+        for digit, label in enumerate(self.digits):
+            labels[label] = digit
+        out = bytearray(81)
+        for i, r in enumerate(self.rows):
+            for j, c in enumerate(self.cols):
+                out[r * 9 + c] = labels[cells[i * 9 + j]]
+        if self.transpose:
+            out = bytearray(out[p] for p in _TRANSPOSED)
+        return Grid(out)
+
+    def __repr__(self) -> str:
+        return f"Transform(transpose={self.transpose}, rows={self.rows}, cols={self.cols}, digits={tuple(self.digits)})"
+
+
+def canonical_form(b: Board) -> Grid:
+    '''
+    Function that returns the canonical form of a board: the smallest board, read as
+    81 digits in row order with blanks as 0, among all ~1.2 trillion boards equivalent
+    to it (see canonicalize). Equivalent boards always get the same canonical form.
+
+        Parameters:
+                b (Grid | list[int][int]): The sudoku board
+
+        Returns:
+                (Grid): The canonical form of the board
+    '''
+    return canonicalize(b)[0]
+
+
+def canonicalize(b: Board) -> Tuple[Grid, Transform]:
+    '''
+    Function that finds the canonical form of a board and the transform leading to it.
+    Digits are relabelled in order of first appearance, which leaves the rows and columns
+    to choose. The rows are picked one at a time, keeping only the row and column orders
+    that give the smallest board so far. The first row alone narrows the column orders
+    down a lot: the smallest first row has its blanks as early as possible, and only the
+    column orders that do so need to be followed. On sparse boards many of these orders
+    only differ in blank columns, so the candidates that can only lead to the same rows
+    are merged (see _merge).
+
+        Parameters:
+                b (Grid | list[int][int]): The sudoku board (9x9 only)
+
+        Returns:
+                (tuple[Grid, Transform]): The canonical form and the transform mapping b to it
+    '''
+    cells = cells_of(b)
+    if len(cells) != CELLS:
+        raise ValueError("Canonical forms are only defined for 9x9 boards")
+    grids = (cells, bytes(cells[p] for p in _TRANSPOSED))
+
+    # Candidates: (transposed, column order, rows used, label table, next label). Label tables
+    # map every digit to its new label (unlabelled ones to _NEW) so rows relabel with translate
+    best, cands = None, []
+    for t, grid in enumerate(grids):
+        for r in range(9):
+            row = grid[r * 9:r * 9 + 9]
+            for cols in _first_row_orders(row, grid):
+                out, table, nxt = _relabel(bytes(itemgetter(*cols)(row)), _EMPTY_TABLE, 1)
+                if best is None or out < best:
+                    best, cands = out, []
+                if out == best:
+                    cands.append((t, cols, (r,), table, nxt))
+
+    result = bytearray(best)
+    projected = {}  # Rows of every band for each (transposed, column order), shared by the slots
+    cands = _merge(cands, grids, projected)
+    for slot in range(1, 9):
+        best, expanded = None, []
+        for t, cols, used, table, nxt in cands:
+            grid = grids[t]
+            getter = itemgetter(*cols)
+            for r in _next_rows(slot, used):
+                raw = bytes(getter(grid[r * 9:r * 9 + 9]))
+                out = raw.translate(table)
+                new_table, new_nxt = table, nxt
+                if _NEW in out:
+                    out, new_table, new_nxt = _relabel(raw, table, nxt)
+                if best is None or out < best:
+                    best, expanded = out, []
+                if out == best:
+                    expanded.append((t, cols, used + (r,), new_table, new_nxt))
+        cands = _merge(expanded, grids, projected)
+        result += best
+
+    t, cols, rows, table, nxt = cands[0]
+    # Digits that do not appear on the board get the labels left over, in order
+    labels = bytearray(table[:10])
+    for d in range(1, 10):
+        if labels[d] == _NEW:
+            labels[d] = nxt
+            nxt += 1
+    return Grid(result), Transform(bool(t), rows, cols, labels)
+
+
+def _relabel(raw: bytes, table: bytes, nxt: int) -> Tuple[bytes, bytes, int]:
+    '''
+    Helper function that gives the digits of a row that have no label yet the next labels,
+    in order of appearance, and relabels the row
+
+        Parameters:
+                raw (bytes):   The cells of the row, in the chosen column order
+                table (bytes): The label of every digit, _NEW for the ones without a label
+                nxt (int):     The next label to hand out
+
+        Returns:
+                (tuple[bytes, bytes, int]): The relabelled row, the extended table and the next label
+    '''
+    new_table = bytearray(table)
+    for v in raw:
+        if new_table[v] == _NEW:
+            new_table[v] = nxt
+            nxt += 1
+    new_table = bytes(new_table)
+    return raw.translate(new_table), new_table, nxt
+
+
+def _merge(cands: List[tuple], grids: Tuple[bytes, bytes], projected: dict) -> List[tuple]:
+    '''
+    Helper function that keeps a single candidate out of those that can only lead to the
+    same rows. What a candidate still adds to the board only depends on its labels and on
+    the rows it has left once its columns are reordered: the ones left in the current band,
+    and the unused bands (each a set of rows, as rows and bands can still be put in any
+    order). Candidates agreeing on all of these give the same canonical form.
+
+        Parameters:
+                cands (list[tuple]):         The candidates of canonicalize
+                grids (tuple[bytes, bytes]): The board and its transposition
+                projected (dict):            The rows of every band for each (transposed, column order)
+                                             met so far, shared by the calls of one canonicalize
+
+        Returns:
+                (list[tuple]): The candidates left, in the order they came
+    '''
+    if len(cands) <= _MERGE_ABOVE:
+        return cands  # Dense boards rarely tie, merging would cost more than it saves
+
+    merged = {}
+    for cand in cands:
+        t, cols, used, table, nxt = cand
+        bands = projected.get((t, cols))
+        if bands is None:
+            cells = bytes(itemgetter(*[r * 9 + c for r in range(9) for c in cols])(grids[t]))
+            rows = [cells[r * 9:r * 9 + 9] for r in range(9)]
+            bands = projected[t, cols] = tuple(tuple(sorted(rows[b * 3:b * 3 + 3])) for b in range(3)), rows
+
+        sorted_bands, rows = bands
+        placed = len(used) % 3
+        if placed:
+            band = used[-1] // 3
+            current = tuple(sorted(rows[r] for r in range(band * 3, band * 3 + 3) if r not in used))
+        else:
+            current = ()
+        taken = {r // 3 for r in used}
+        rest = tuple(sorted(sorted_bands[b] for b in range(3) if b not in taken))
+        merged.setdefault((table, nxt, current, rest), cand)
+    return list(merged.values())
+
+
+def dedup(puzzles: Iterable[Board]) -> Iterator[Board]:
+    '''
+    Generator that drops every board equivalent to one seen before. Only the canonical
+    forms are remembered (81 bytes per equivalence class).
+
+        Parameters:
+                puzzles (iterable[Grid | list[int][int]]): The boards to filter
+
+        Yields:
+                (Grid | list[int][int]): The first board of every equivalence class, as given
+    '''
+    seen = set()
+    for board in puzzles:
+        key = bytes(canonical_form(board))
+        if key not in seen:
+            seen.add(key)
+            yield board
+
+
+def _first_row_orders(row: bytes, grid: bytes) -> List[Tuple[int]]:
+    '''
+    Helper function that lists the column orders putting the blanks of a row as early
+    as possible: stacks with more blanks first and, within each stack, blanks first.
+    For a valid row these are exactly the orders giving the smallest relabelled row.
+    Orders that only swap identical columns (or stacks) give the same board, so only the
+    one keeping them in their original order is listed (sparse boards have many of these).
+
+        Parameters:
+                row (bytes):  The 9 cells of the row
+                grid (bytes): The (transposed) board the row comes from
+
+        Returns:
+                (list[tuple[int]]): The column orders (column placed in each position)
+    '''
+    columns = [grid[c::9] for c in range(9)]
+    stacks = [tuple(sorted(columns[s * 3:s * 3 + 3])) for s in range(3)]
+    blanks = [sum(1 for c in range(s * 3, s * 3 + 3) if not row[c]) for s in range(3)]
+    stack_orders = [order for order in _TRIPLES
+                    if blanks[order[0]] >= blanks[order[1]] >= blanks[order[2]]]
+    if len(set(stacks)) < 3:
+        stack_orders = [order for order in stack_orders if _in_order(order, stacks)]
+
+    # Orders within each stack that keep its blanks first
+    within = []
+    for s in range(3):
+        stack = (s * 3, s * 3 + 1, s * 3 + 2)
+        orders = [p for p in _TRIPLES if all(not row[stack[p[i]]] or row[stack[p[i + 1]]] for i in range(2))]
+        if len(set(columns[s * 3:s * 3 + 3])) < 3:
+            orders = [p for p in orders if _in_order(p, columns[s * 3:s * 3 + 3])]
+        within.append([tuple(stack[i] for i in p) for p in orders])
+
+    return [x + y + z for a, b, c in stack_orders
+            for x, y, z in product(within[a], within[b], within[c])]
+
+
+def _in_order(order: Tuple[int], items: list) -> bool:
+    """Helper function that checks that an order keeps equal items in their original order"""
+    return all(order[i] < order[j] for i in range(3) for j in range(i + 1, 3)
+               if items[order[i]] == items[order[j]])
+
+
+def _next_rows(slot: int, used: Tuple[int]) -> Iterable[int]:
+    '''
+    Helper function that lists the rows that may be placed in a slot given the rows
+    placed before it: any row of an unused band at the start of a band, otherwise the
+    rows left in the current band
+
+        Parameters:
+                slot (int):        The row position being filled (1-8)
+                used (tuple[int]): The rows placed in the slots before
+
+        Returns:
+                (iterable[int]): The rows that may go in the slot
+    '''
+    if slot % 3 == 0:
+        bands = {r // 3 for r in used}
+        return [r for r in range(9) if r // 3 not in bands]
+    band = used[slot - slot % 3] // 3
+    return [r for r in range(band * 3, band * 3 + 3) if r not in used]
@@ -0,0 +1,234 @@
+# Exact cover solver using Knuth's Dancing Links (Algorithm X)
+
+from controller.stats import SolveStats, measure
+from model.grid import SIZE, Board, cells_of, geometry, size_of, store_cells
+from typing import List
+
+
+class _DancingLinks:
+    """
+    Class modelling the toroidal doubly linked list used by Algorithm X. Every node is
+    an index into flat arrays of links, which avoids creating a Python object per node.
+    Node 0 is the root and nodes 1-324 are the column headers (4 * n * n for a board
+    of n rows). The 4 groups of constraints (cell, row, column and box) take n * n columns each.
+
+    Attributes
+    ----------
+    n : int
+        the number of rows and columns of the board
+    num_columns : int
+        the number of constraint columns
+    left, right, up, down : list[int]
+        the links of every node in the matrix
+    column : list[int]
+        the column header of every node
+    choice : list[int]
+        the (row, col, num) choice encoded by the matrix row of every node
+    size : list[int]
+        the number of nodes left in each column
+    """
+
+    def __init__(self, n: int = SIZE) -> None:
+        """
+        Constructor function that builds the full exact cover matrix (729 x 324 for the classic board)
+
+            Parameters:
+                    n (int): The number of rows and columns of the board
+        """
+        geo = geometry(n)
+        cells = geo.cells
+        self.n = n
+        self.num_columns = 4 * cells
+        headers = self.num_columns + 1
+        self.left = [i - 1 for i in range(headers)]
+        self.right = [i + 1 for i in range(headers)]
+        self.left[0], self.right[-1] = self.num_columns, 0
+        self.up = list(range(headers))
+        self.down = list(range(headers))
+        self.column = list(range(headers))
+        self.choice = [None] * headers
+        self.size = [0] * headers
+
+        for pos in range(cells):
+            row, col, box = geo.row_of[pos], geo.col_of[pos], geo.box_of[pos]
+            for num in range(1, n + 1):
+                self._add_row((row, col, num), (
+                    pos,
+                    cells + row * n + num - 1,
+                    2 * cells + col * n + num - 1,
+                    3 * cells + box * n + num - 1,
+                ))
+
+    def _add_row(self, choice: tuple, columns: tuple) -> None:
+        """
+        Helper function that appends a matrix row with a node in each of the given columns
+
+            Parameters:
+                    choice (tuple[int]): The (row, col, num) placement represented by the row
+                    columns (tuple[int]): The zero based constraint columns satisfied by the placement
+        """
+        first = len(self.column)
+        for i, col in enumerate(columns):
+            header = col + 1
+            node = first + i
+            # Insert the node at the bottom of its column
+            self.up.append(self.up[header])
+            self.down.append(header)
+            self.down[self.up[header]] = node
+            self.up[header] = node
+            # Link the node to its neighbours in the row
+            self.left.append(first + (i - 1) % len(columns))
+            self.right.append(first + (i + 1) % len(columns))
+            self.column.append(header)
+            self.choice.append(choice)
+            self.size[header] += 1
+
+    def cover(self, header: int) -> None:
+        """Function that removes a column and every row that intersects it from the matrix"""
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header: int) -> None:
+        """Function that reverses cover(), restoring the links in the opposite order"""
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def select(self, choice: tuple) -> bool:
+        """
+        Function that commits to a placement before the search starts (used for the givens)
+
+            Parameters:
+                    choice (tuple[int]): The (row, col, num) placement to commit to
+
+            Returns:
+                    (bool): Whether or not the placement was still available
+        """
+        row, col, num = choice
+        n = self.n
+        if not 1 <= num <= n:
+            return False
+        node = self.num_columns + 1 + ((row * n + col) * n + num - 1) * 4
+        # Every column of the placement must still be in the header list
+        j = node
+        while True:
+            header = self.column[j]
+            if self.right[self.left[header]] != header:
+                return False
+            j = self.right[j]
+            if j == node:
+                break
+
+        j = node
+        while True:
+            self.cover(self.column[j])
+            j = self.right[j]
+            if j == node:
+                break
+        return True
+
+    def search(self, solution: List[tuple], stats: SolveStats = None) -> bool:
+        """
+        Recursive Algorithm X search, always branching on the column with the fewest nodes
+
+            Parameters:
+                    solution (list[tuple]): The placements chosen so far (extended in place)
+                    stats (SolveStats): Optional object where the search statistics are added up
+
+            Returns:
+                    True/False (boolean): A value to stop the search
+        """
+        right, down, size = self.right, self.down, self.size
+        if right[0] == 0:
+            return True  # Every constraint is satisfied
+
+        header, best = 0, self.n + 1
+        c = right[0]
+        while c != 0:
+            if size[c] < best:
+                header, best = c, size[c]
+                if best <= 1:
+                    break
+            c = right[c]
+
+        if best == 0:
+            return False  # Some constraint can no longer be satisfied
+
+        self.cover(header)
+        i = down[header]
+        while i != header:
+            solution.append(self.choice[i])
+            if stats is not None:
+                row, col, num = self.choice[i]
+                stats.place((row, col), num)
+            j = right[i]
+            while j != i:
+                self.cover(self.column[j])
+                j = right[j]
+
+            if self.search(solution, stats):
+                return True
+
+            if stats is not None:
+                row, col, num = self.choice[i]
+                stats.remove((row, col), num)
+            solution.pop()
+            j = self.left[i]
+            while j != i:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            i = down[i]
+
+        self.uncover(header)
+        return False
+
+
+def solve_dlx(b: Board, stats: SolveStats = None) -> bool:
+    '''
+    Function that solves a partially complete sudoku board by modelling it as an exact
+    cover problem (one row per placement, one column per constraint) and running
+    Algorithm X on top of Dancing Links.
+
+        Parameters:
+                b (Grid | list[int][int]): The incomplete sudoku board
+                stats (SolveStats): Optional object where the search statistics are added up
+
+        Returns:
+                True/False (boolean): Whether or not the board was solved (filled in place)
+    '''
+    with measure(stats):
+        n = size_of(b)
+        links = _DancingLinks(n)
+        cells = cells_of(b)
+        for pos, num in enumerate(cells):
+            if num != 0 and not links.select((pos // n, pos % n, num)):
+                return False  # The givens already break the rules
+
+        solution = []
+        if not links.search(solution, stats):
+            return False
+
+    cells = bytearray(cells)
+    for row, col, num in solution:
+        cells[row * n + col] = num
+    store_cells(b, cells)
+    return True
@@ -1,37 +1,230 @@
 # Helper functions used to generate a random sudoku board
 
-from controller.solver import check_valid, solve_backtrack
-from copy import deepcopy
-from random import randint as r
+from controller.budget import Budget, BudgetExceeded, CancelToken, make_budget
+from controller.solver import check_valid, count_solutions, solve_bitmask, with_budget
+from controller.stats import SolveStats
+from model.grid import SIZE, Board, Grid, geometry, size_of
+from random import Random
 
-def generate_board():
+DEFAULT_CLUES = 32  # Number of clues left on the board by the dig-holes generator
+# Clues left on boards of the other sizes (about the same share of the cells for 16x16 and 25x25)
+CLUES_BY_SIZE = {4: 6, 9: DEFAULT_CLUES, 16: 120, 25: 330}
+# Search nodes per cell a random grid gets to be completed before new diagonal boxes are drawn.
+# Most 16x16 grids take a few hundred nodes but a few take millions, so starting over is cheaper
+COMPLETION_NODES_PER_CELL = 16
+
+
+def generate_board(unique: bool = True, clues: int = None, seed: int = None, mode: str = "dig",
+                   compact: bool = False, size: int = SIZE, timeout: float = None, max_nodes: int = None,
+                   cancel: CancelToken = None) -> Board:
     """
     Function that generates a random, partially filled board
 
+        Parameters:
+                unique (bool):  Only accept boards that have exactly one solution
+                clues (int):    The number of clues to leave on the board ("dig" mode only),
+                                None for the default of the size (see CLUES_BY_SIZE). This is
+                                a target: unique boards keep more clues when none of the rest
+                                can go without a second solution (22 typically gives 22-28)
+                seed (int):     Seed for the random generator, so boards can be reproduced
+                mode (str):     "dig" to remove clues from a random complete grid, or "random"
+                                to fill random cells until a solvable board comes out
+                compact (bool): Return the board as a Grid instead of the nested list format
+                size (int):     The number of rows and columns (9, or 4, 16 and 25)
+                timeout (float):     Seconds the generation may take, None for no limit
+                max_nodes (int):     Search nodes the generation may use in total, None for no limit
+                cancel (CancelToken): Optional token that stops the generation when cancelled
+
+        Returns:
+                (Grid | list[int][int]): The board, in the format of the model used by the Board object
+                                         (raises BudgetExceeded when a limit is reached first)
+    """
+    rng = Random(seed)
+    if clues is None:
+        clues = CLUES_BY_SIZE[geometry(size).size]
+    budget = make_budget(timeout, max_nodes, cancel)
+    stats = None if budget is None else SolveStats(budget=budget)
+
+    if mode == "dig":
+        board = dig_holes(random_solution(rng, size, stats), clues, unique, rng, stats)
+    elif mode == "random":
+        board = _generate_random(unique, rng, size, stats)
+    else:
+        raise ValueError(f"Unknown generator mode '{mode}', expected 'dig' or 'random'")
+
+    return board if compact else board.to_rows()
+
+
+def random_solution(rng: Random, size: int = SIZE, stats: SolveStats = None) -> Grid:
+    """
+    Function that builds a random complete sudoku grid. The diagonal boxes are
+    independent of each other, so they are filled with random permutations and the
+    solver completes the rest (starting over if it cannot, or cannot within
+    COMPLETION_NODES_PER_CELL nodes per cell). Rows, columns, bands, stacks and digits
+    are then shuffled.
+
+        Parameters:
+                rng (random.Random): The random generator to draw from
+                size (int):          The number of rows and columns
+                stats (SolveStats):  Optional object where the search statistics (and budget) are kept
+
+        Returns:
+                (Grid): A complete, valid sudoku grid
+    """
+    geo = geometry(size)
+    n = geo.box
+    diagonal = geo.boxes[::n + 1]  # The boxes on the diagonal
+    while True:
+        _check(stats)
+        grid = Grid(size=size)
+        for box in range(n):
+            digits = rng.sample(range(1, size + 1), size)
+            for pos, num in zip(diagonal[box], digits):
+                grid[pos] = num
+        if _complete(grid, stats):
+            break  # Only 4x4 diagonal boxes can leave the rest impossible to fill, larger ones can be slow
+
+    return shuffle_grid(grid, rng)
+
+
+def shuffle_grid(b: Board, rng: Random) -> Board:
+    """
+    Function that applies a random validity preserving transformation to a board:
+    rows are shuffled within bands, bands are shuffled, columns and stacks likewise,
+    and the digits are relabelled. Clue count and number of solutions do not change.
+
+        Parameters:
+                b (Grid | list[int][int]): The sudoku board
+                rng (random.Random):       The random generator to draw from
+
         Returns:
-                (list[int][int]): 2D array representing the model being used by the Board object
+                (Grid | list[int][int]): The transformed board, in the same format as b
+    """
+    size = size_of(b)
+    n = geometry(size).box
+    bands, stacks = rng.sample(range(n), n), rng.sample(range(n), n)
+    rows = [band*n + r for band in bands for r in rng.sample(range(n), n)]
+    cols = [stack*n + c for stack in stacks for c in rng.sample(range(n), n)]
+    digits = [0] + rng.sample(range(1, size + 1), size)
+
+    if isinstance(b, Grid):
+        return Grid(digits[b[row*size + col]] for row in rows for col in cols)
+    return [[digits[b[row][col]] for col in cols] for row in rows]
+
+
+def dig_holes(solution: Grid, clues: int, unique: bool, rng: Random, stats: SolveStats = None) -> Grid:
     """
+    Function that removes clues from a complete grid in random order until only the
+    requested number is left. Every cell is tried at most once, so the cost is bounded
+    by one uniqueness check per cell, and when unique is set the board can run out of
+    removable clues first, leaving more than requested.
 
-    prob_filled = 2  # Increase this number to increase difficulty (TODO: Make this feature?)
+        Parameters:
+                solution (Grid):      The complete grid (modified in place)
+                clues (int):          The number of clues to leave on the board
+                unique (bool):        Whether removals that allow a second solution are undone
+                rng (random.Random):  The random generator to draw from
+                stats (SolveStats):   Optional object where the search statistics (and budget) are kept
+
+        Returns:
+                (Grid): The puzzle, with at least the requested number of clues
+    """
+    board = solution
+    filled = len(board)
+
+    for pos in rng.sample(range(filled), filled):
+        if filled <= clues:
+            break
+
+        _check(stats)
+        num = board[pos]
+        board[pos] = 0
+        if unique and count_solutions(board, 2, stats) != 1:
+            board[pos] = num  # Removing this clue makes the puzzle ambiguous
+        else:
+            filled -= 1
+
+    return board
+
+
+def _generate_random(unique: bool, rng: Random, size: int = SIZE, stats: SolveStats = None) -> Grid:
+    """
+    Function that fills random cells until it finds a solvable board (rejection sampling)
+
+        Parameters:
+                unique (bool):       Only accept boards that have exactly one solution
+                rng (random.Random): The random generator to draw from
+                size (int):          The number of rows and columns
+                stats (SolveStats):  Optional object where the search statistics (and budget) are kept
+
+        Returns:
+                (Grid): The board
+    """
+
+    prob_filled = 2  # Increase this number to increase difficulty
 
     # While the sudoku board is not solvable...
     while True:
+        _check(stats)
 
         # Initialise a new board
-        new_board = [[0 for i in range(9)] for j in range(9)]
+        new_board = [[0 for i in range(size)] for j in range(size)]
+
+        for y in range(size):
+            for x in range(size):
 
-        for y in range(9):
-            for x in range(9):
-                
                 # Each sudoku cell has a 80% chance of getting a number (see above)
-                if r(1, 10) >= prob_filled:
-                    new_board[y][x] = r(1, 9)  # Fill cell with random number 1 - 9
+                if rng.randint(1, 10) >= prob_filled:
+                    new_board[y][x] = rng.randint(1, size)  # Fill cell with random number 1 - 9 (or up to size)
                     if check_valid(new_board, new_board[y][x], (y, x)):
                         continue  # If it is a valid move, then accept it
                     else:
                         new_board[y][x] = 0  # Otherwise, delete this move
 
-        result_board = deepcopy(new_board)
-        # If the board is solvable, return it
-        if solve_backtrack(new_board):
-            return result_board
+        # If the board has a single solution (or just any solution), return it
+        if unique:
+            if count_solutions(new_board, 2, stats) == 1:
+                return Grid.from_rows(new_board)
+            continue
+
+        if count_solutions(new_board, 1, stats) == 1:
+            return Grid.from_rows(new_board)
+
+
+def _complete(grid: Grid, stats: SolveStats = None) -> bool:
+    """
+    Helper function that fills in a random grid with the solver, giving up once the
+    search takes more than COMPLETION_NODES_PER_CELL nodes per cell
+
+        Parameters:
+                grid (Grid):         The grid with its diagonal boxes filled (completed in place)
+                stats (SolveStats):  Optional object where the search statistics (and budget) are kept
+
+        Returns:
+                (bool): Whether or not the grid was completed (raises BudgetExceeded when the
+                        budget of stats runs out first)
+    """
+    outer = None if stats is None else stats.budget
+    limit = COMPLETION_NODES_PER_CELL * len(grid)
+    attempt = Budget(max_nodes=limit)
+    if outer is not None:
+        # The attempt stands in for the budget of the call while it runs, so it inherits its limits
+        attempt.deadline, attempt.cancel = outer.deadline, outer.cancel
+        if outer.max_nodes is not None:
+            attempt.max_nodes = min(limit, outer.max_nodes - outer.nodes)
+
+    try:
+        return with_budget(lambda s: solve_bitmask(grid, s), grid, stats, attempt)
+    except BudgetExceeded as e:
+        if e.reason == "max_nodes" and attempt.max_nodes == limit:
+            return False  # Too slow, new diagonal boxes are cheaper than finishing the search
+        raise BudgetExceeded(e.reason, outer.nodes + attempt.nodes) from None
+    finally:
+        if outer is not None:
+            outer.nodes += attempt.nodes
+
+
+def _check(stats: SolveStats) -> None:
+    """Helper function that raises BudgetExceeded between generator attempts if the budget of stats ran out"""
+    if stats is not None and stats.budget is not None:
+        stats.budget.check()
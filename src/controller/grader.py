@@ -0,0 +1,312 @@
+# Difficulty grader that solves a board with a ladder of human solving techniques
+
+from dataclasses import dataclass, field
+from model.grid import CELLS, Board, cells_of, geometry
+from typing import Callable, Dict, List, Tuple
+
+# Units (9 rows, 9 columns, 9 boxes) as tuples of flat cell positions, from the shared tables of the classic board
+_GEO = geometry()
+_ROWS, _COLS, _BOXES, _UNITS = _GEO.rows, _GEO.cols, _GEO.boxes, _GEO.units
+_PEERS, _BOX_OF = _GEO.peers, _GEO.box_of
+_ALL_DIGITS, _POPCOUNT = _GEO.all_digits, _GEO.popcount  # Bit d set means digit d (1-9) is a candidate
+
+# The single bit masks making up every mask, kept here since the grader is the only user of
+# the table (and only grades the classic board, the 25x25 table would be far too large)
+_BITS = tuple(tuple(1 << d for d in range(1, 10) if m >> d & 1) for m in range(_ALL_DIGITS + 1))
+
+# The ladder, easiest first, with the weight of each step (roughly the Sudoku Explainer ratings)
+TECHNIQUES = (
+    ("hidden single", 1.2),
+    ("naked single", 2.3),
+    ("pointing", 2.6),
+    ("claiming", 2.8),
+    ("naked pair", 3.0),
+    ("x-wing", 3.2),
+    ("hidden pair", 3.4),
+    ("naked triple", 3.6),
+)
+BACKTRACKING = ("backtracking", 8.0)  # Rating of boards the ladder cannot finish
+
+
+class _Contradiction(Exception):
+    """Exception raised when a cell or a unit runs out of candidates"""
+
+
+@dataclass
+class Grade:
+    """
+    Data Class with the difficulty of a board, as returned by grade
+
+    Attributes
+    ----------
+    technique : str
+        the hardest technique needed, "backtracking" if the ladder could not finish the board
+        (or it has no solution), None if the board was already full
+    level : int
+        the position of that technique in the ladder (len(TECHNIQUES) for backtracking, -1 for none)
+    score : float
+        the sum of the weights of every step taken, plus the backtracking weight if the ladder got stuck
+    solved : bool
+        whether or not the ladder finished the board
+    steps : dict[str, int]
+        the number of times each technique was applied
+    """
+    technique: str = None
+    level: int = -1
+    score: float = 0.0
+    solved: bool = False
+    steps: Dict[str, int] = field(default_factory=dict)
+
+
+def grade(b: Board) -> Grade:
+    '''
+    Function that grades a board by solving it the way a person would: every step uses
+    the easiest technique of the ladder that makes progress. The candidates are kept
+    as bitmasks, so a board only needing singles takes well under a millisecond.
+
+        Parameters:
+                b (Grid | list[int][int]): The 9x9 sudoku board (left untouched)
+
+        Returns:
+                (Grade): The hardest technique needed, its level, the score and the step counts
+    '''
+    cells = cells_of(b)
+    if len(cells) != CELLS:
+        raise ValueError("Only 9x9 boards can be graded")
+    state = _State(cells)
+    result = Grade()
+    try:
+        state.start()
+        while state.left:
+            for level, technique in enumerate(_LADDER):
+                applied = technique(state)
+                if applied:
+                    name, weight = TECHNIQUES[level]
+                    result.steps[name] = result.steps.get(name, 0) + applied
+                    result.score += weight * applied
+                    result.level = max(result.level, level)
+                    break
+            else:
+                break  # No technique makes progress
+    except _Contradiction:
+        pass
+
+    result.solved = not state.left and not state.broken
+    if not result.solved:
+        result.level = len(TECHNIQUES)
+        result.score += BACKTRACKING[1]
+        result.technique = BACKTRACKING[0]
+    elif result.level >= 0:
+        result.technique = TECHNIQUES[result.level][0]
+    result.score = round(result.score, 1)
+    return result
+
+
+class _State:
+    """
+    Class modelling the pencil marks of a board while it is being graded
+
+    Attributes
+    ----------
+    grid : list[int]
+        the numbers of the 81 cells, 0 for empty ones
+    cands : list[int]
+        the candidate bitmask of every cell, 0 for filled ones
+    left : int
+        the number of empty cells
+    broken : bool
+        whether or not a contradiction was found
+    """
+
+    def __init__(self, cells: bytes) -> None:
+        self.grid = list(cells)
+        self.cands = [_ALL_DIGITS] * 81
+        self.left = 81
+        self.broken = False
+
+    def start(self) -> None:
+        """Function that places the givens, removing them from the candidates of their peers"""
+        for pos, num in enumerate(self.grid):
+            if num:
+                if not self.cands[pos] & (1 << num):
+                    self.broken = True
+                    raise _Contradiction
+                self.place(pos, num)
+
+    def place(self, pos: int, num: int) -> None:
+        """Function that fills a cell and removes the number from the candidates of its peers"""
+        self.grid[pos] = num
+        self.cands[pos] = 0
+        self.left -= 1
+        keep = ~(1 << num)
+        cands = self.cands
+        for p in _PEERS[pos]:
+            if cands[p]:
+                cands[p] &= keep
+                if not cands[p]:
+                    self.broken = True
+                    raise _Contradiction
+
+    def eliminate(self, positions: Tuple[int], mask: int) -> bool:
+        """Function that removes the digits in mask from the candidates of the given cells"""
+        cands = self.cands
+        changed = False
+        for p in positions:
+            if cands[p] & mask:
+                cands[p] &= ~mask
+                changed = True
+                if not cands[p]:
+                    self.broken = True
+                    raise _Contradiction
+        return changed
+
+
+def _hidden_single(state: _State) -> int:
+    """Technique: a digit that fits in only one cell of a unit goes there"""
+    cands = state.cands
+    placed = 0
+    for unit in _UNITS:
+        once = twice = 0
+        for p in unit:
+            c = cands[p]
+            twice |= once & c
+            once |= c
+        singles = once & ~twice
+        if singles:
+            for p in unit:
+                c = cands[p] & singles
+                if c and cands[p]:
+                    state.place(p, (c & -c).bit_length() - 1)
+                    placed += 1
+    return placed
+
+
+def _naked_single(state: _State) -> int:
+    """Technique: a cell with a single candidate left gets that number"""
+    cands = state.cands
+    placed = 0
+    for p in range(81):
+        c = cands[p]
+        if c and _POPCOUNT[c] == 1:
+            state.place(p, c.bit_length() - 1)
+            placed += 1
+    return placed
+
+
+def _pointing(state: _State) -> int:
+    """Technique: a digit confined to one row or column of a box is removed from the rest of that line"""
+    cands = state.cands
+    applied = 0
+    for box in _BOXES:
+        for i in (0, 3, 6):
+            # Digits of this line of the box that appear nowhere else in the box
+            row_mask = cands[box[i]] | cands[box[i + 1]] | cands[box[i + 2]]
+            col_mask = cands[box[i // 3]] | cands[box[i // 3 + 3]] | cands[box[i // 3 + 6]]
+            rest_row = rest_col = 0
+            for j in range(9):
+                if j // 3 != i // 3:
+                    rest_row |= cands[box[j]]
+                if j % 3 != i // 3:
+                    rest_col |= cands[box[j]]
+            only_row = row_mask & ~rest_row
+            only_col = col_mask & ~rest_col
+            if only_row:
+                line = _ROWS[box[i] // 9]
+                applied += state.eliminate([p for p in line if p not in box], only_row)
+            if only_col:
+                line = _COLS[box[i // 3] % 9]
+                applied += state.eliminate([p for p in line if p not in box], only_col)
+    return applied
+
+
+def _claiming(state: _State) -> int:
+    """Technique: a digit confined to one box within a row or column is removed from the rest of that box"""
+    cands = state.cands
+    applied = 0
+    for line in _ROWS + _COLS:
+        segments = (cands[line[0]] | cands[line[1]] | cands[line[2]],
+                    cands[line[3]] | cands[line[4]] | cands[line[5]],
+                    cands[line[6]] | cands[line[7]] | cands[line[8]])
+        for s in range(3):
+            only = segments[s] & ~(segments[(s + 1) % 3] | segments[(s + 2) % 3])
+            if only:
+                box = _BOXES[_BOX_OF[line[s * 3]]]
+                applied += state.eliminate([p for p in box if p not in line], only)
+    return applied
+
+
+def _naked_pair(state: _State) -> int:
+    """Technique: two cells of a unit with the same two candidates remove them from the rest of the unit"""
+    cands = state.cands
+    applied = 0
+    for unit in _UNITS:
+        seen = {}
+        for p in unit:
+            c = cands[p]
+            if _POPCOUNT[c] == 2:
+                if c in seen:
+                    applied += state.eliminate([q for q in unit if q != p and q != seen[c]], c)
+                else:
+                    seen[c] = p
+    return applied
+
+
+def _x_wing(state: _State) -> int:
+    """Technique: a digit confined to the same two columns in two rows is removed from the rest of those columns (and vice versa)"""
+    cands = state.cands
+    applied = 0
+    for lines, crosses in ((_ROWS, _COLS), (_COLS, _ROWS)):
+        for bit in _BITS[_ALL_DIGITS]:
+            seen = {}
+            for li, line in enumerate(lines):
+                where = tuple(i for i in range(9) if cands[line[i]] & bit)
+                if len(where) != 2:
+                    continue
+                if where in seen:
+                    other = seen[where]
+                    for i in where:
+                        cross = crosses[i]
+                        applied += state.eliminate([cross[j] for j in range(9) if j != li and j != other], bit)
+                else:
+                    seen[where] = li
+    return applied
+
+
+def _hidden_pair(state: _State) -> int:
+    """Technique: two digits that fit in the same two cells of a unit only, leave those cells with just that pair"""
+    cands = state.cands
+    applied = 0
+    for unit in _UNITS:
+        seen = {}
+        for bit in _BITS[_ALL_DIGITS]:
+            where = tuple(p for p in unit if cands[p] & bit)
+            if len(where) != 2:
+                continue
+            if where in seen:
+                pair = seen[where] | bit
+                applied += state.eliminate(where, _ALL_DIGITS & ~pair)
+            else:
+                seen[where] = bit
+    return applied
+
+
+def _naked_triple(state: _State) -> int:
+    """Technique: three cells of a unit with only three candidates between them remove those from the rest of the unit"""
+    cands = state.cands
+    applied = 0
+    for unit in _UNITS:
+        small = [p for p in unit if 2 <= _POPCOUNT[cands[p]] <= 3]
+        for i in range(len(small)):
+            for j in range(i + 1, len(small)):
+                for k in range(j + 1, len(small)):
+                    mask = cands[small[i]] | cands[small[j]] | cands[small[k]]
+                    if _POPCOUNT[mask] == 3:
+                        trio = (small[i], small[j], small[k])
+                        applied += state.eliminate([p for p in unit if p not in trio], mask)
+    return applied
+
+
+# The technique functions in the same order as TECHNIQUES
+_LADDER: List[Callable[[_State], int]] = [
+    _hidden_single, _naked_single, _pointing, _claiming, _naked_pair, _x_wing, _hidden_pair, _naked_triple,
+]
@@ -0,0 +1,118 @@
+# Background puzzle generation, keeping a few boards ready to be handed out instantly
+
+from controller.budget import BudgetExceeded, CancelToken
+from controller.generate import DEFAULT_CLUES, generate_board
+from itertools import count
+from model.grid import Grid
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+
+DEFAULT_DEPTH = 4  # Boards kept ready in the queue
+_POLL = 0.1  # Seconds the worker waits on a full queue before checking whether it was stopped
+
+
+class PuzzleQueue:
+    """
+    Class modelling a queue of freshly generated boards, refilled by a worker thread.
+    Taking a board from it is instant as long as the worker keeps up, and the worker
+    starts on a replacement as soon as one is taken.
+
+    Attributes
+    ----------
+    depth : int
+        the number of boards kept ready
+    clues : int
+        the number of clues left on each board (fewer is harder)
+    unique : bool
+        whether or not the boards must have exactly one solution
+    seed : int
+        seed of the first board (incremented for the rest), None for random boards
+
+    Methods
+    -------
+    start():
+        starts the worker thread
+    get(block):
+        takes a ready board from the queue
+    stop():
+        stops the worker thread
+    """
+
+    def __init__(self, depth: int = DEFAULT_DEPTH, clues: int = DEFAULT_CLUES, unique: bool = True,
+                 seed: int = None) -> None:
+        """
+        Constructor function that initialises the queue (the worker is not started yet)
+
+            Parameters:
+                    depth (int):   The number of boards kept ready
+                    clues (int):   The number of clues left on each board
+                    unique (bool): Only generate boards that have exactly one solution
+                    seed (int):    Seed of the first board (incremented for the rest), None for random boards
+        """
+        self.depth = depth
+        self.clues = clues
+        self.unique = unique
+        self.seed = seed
+        self._queue = Queue(maxsize=depth)
+        self._stop = Event()
+        self._cancel = CancelToken()  # Interrupts the board the worker is generating when stopped
+        self._thread = None
+        self._seeds = None if seed is None else count(seed)
+
+    def start(self) -> "PuzzleQueue":
+        """Function that starts the worker thread filling the queue"""
+        if self._thread is None:
+            self._stop.clear()
+            self._cancel = CancelToken()
+            self._thread = Thread(target=self._fill, name="puzzle-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def get(self, block: bool = False) -> Grid:
+        """
+        Function that takes a ready board from the queue
+
+            Parameters:
+                    block (bool): Wait for the worker when the queue is empty, instead of
+                                  generating a board in the calling thread
+
+            Returns:
+                    (Grid): The generated board
+        """
+        try:
+            return self._queue.get(block and self._thread is not None)
+        except Empty:
+            return self._generate()  # The worker has not caught up (or was never started)
+
+    def stop(self) -> None:
+        """Function that stops the worker thread, interrupting the board it is generating"""
+        if self._thread is not None:
+            self._stop.set()
+            self._cancel.cancel()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "PuzzleQueue":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _fill(self) -> None:
+        """Helper function run by the worker thread, generating boards while there is room for them"""
+        while not self._stop.is_set():
+            try:
+                board = self._generate(self._cancel)
+            except BudgetExceeded:
+                return  # Stopped halfway through a board
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(board, timeout=_POLL)
+                    break
+                except Full:
+                    continue
+
+    def _generate(self, cancel: CancelToken = None) -> Grid:
+        """Helper function that generates the next board with the configured difficulty (stopped by cancel, if given)"""
+        seed = None if self._seeds is None else next(self._seeds)
+        return generate_board(self.unique, self.clues, seed, compact=True, cancel=cancel)
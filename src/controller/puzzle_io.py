@@ -0,0 +1,121 @@
+# Helper functions used to read and write boards in the 81 characters per line format
+
+from model.grid import SIZE, SIZES, SYMBOLS, Board, Grid
+from os import PathLike
+from typing import IO, Callable, Iterable, Iterator, Tuple, Union
+
+BLANKS = ".0"  # Characters accepted for an empty cell
+_NUMBERS = {char: num for num, char in enumerate(SYMBOLS, 1)}  # Number of every symbol, 10 and up written as letters
+_NUMBERS.update({char.lower(): num for char, num in _NUMBERS.items()})
+_LENGTHS = {size * size: size for size in SIZES}
+
+Source = Union[str, PathLike, IO[str], Iterable[str]]
+
+
+def parse_puzzle(line: str, compact: bool = False, sizes: Tuple[int] = SIZES) -> Board:
+    """
+    Function that parses a board written as a single line of 81 characters (or 16, 256
+    and 625 for the other sizes, with the numbers from 10 up written as letters A-P)
+
+        Parameters:
+                line (str):            The digits of the board in row order, with '.' or '0' for blanks
+                compact (bool):        Return the board as a Grid instead of the nested list format
+                sizes (tuple[int]):    The board sizes accepted (all of SIZES by default)
+
+        Returns:
+                (Grid | list[int][int]): The sudoku board
+    """
+    line = line.strip()
+    size = _LENGTHS.get(len(line))
+    if size not in sizes:
+        lengths = [n * n for n in sorted(sizes, key=lambda n: n != SIZE)]  # The classic board first
+        others = f" (or {', '.join(map(str, lengths[1:]))})" if len(lengths) > 1 else ""
+        raise ValueError(f"Expected {lengths[0]} characters per puzzle{others}, got {len(line)}")
+
+    board = Grid(size=size)
+    for i, char in enumerate(line):
+        if char in BLANKS:
+            continue
+        num = _NUMBERS.get(char, 0)
+        if not 1 <= num <= size:
+            raise ValueError(f"Invalid character '{char}' at position {i}")
+        board[i] = num
+
+    return board if compact else board.to_rows()
+
+
+def format_puzzle(b: Board, blank: str = ".") -> str:
+    """
+    Function that writes a board as a single line of 81 characters (one per cell for the
+    other sizes)
+
+        Parameters:
+                b (Grid | list[int][int]): The sudoku board
+                blank (str):               The character used for empty cells
+
+        Returns:
+                (str): The board in row order, without a trailing newline
+    """
+    cells = b if isinstance(b, Grid) else (num for row in b for num in row)
+    return "".join(SYMBOLS[num - 1] if num else blank for num in cells)
+
+
+def read_puzzles(source: Source, compact: bool = False, on_error: Callable[[int, str], None] = None,
+                 sizes: Tuple[int] = SIZES) -> Iterator[Board]:
+    """
+    Generator that lazily reads boards one line at a time, so memory use does not
+    depend on the size of the input. Empty lines and lines starting with '#' are skipped.
+
+        Parameters:
+                source (str | PathLike | file | iterable[str]): A path, an open text file or any
+                                                                  iterable of lines (e.g. sys.stdin)
+                compact (bool):        Yield the boards as Grids instead of the nested list format
+                on_error (callable):   Called with the line number and the error message of every
+                                       malformed line, which is then skipped (by default the
+                                       first one raises a ValueError)
+                sizes (tuple[int]):    The board sizes accepted, lines of other sizes count
+                                       as malformed (all of SIZES by default)
+
+        Yields:
+                (Grid | list[int][int]): Every puzzle in the source
+    """
+    if isinstance(source, (str, PathLike)):
+        with open(source) as f:
+            yield from read_puzzles(f, compact, on_error, sizes)
+        return
+
+    for lineno, line in enumerate(source, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            board = parse_puzzle(line, compact, sizes)
+        except ValueError as e:
+            if on_error is None:
+                raise ValueError(f"Line {lineno}: {e}") from None
+            on_error(lineno, str(e))
+            continue
+        yield board
+
+
+def write_puzzles(puzzles: Iterable[Board], dest: Union[str, PathLike, IO[str]], blank: str = ".") -> int:
+    """
+    Function that writes boards one per line as they are produced by the iterable
+
+        Parameters:
+                puzzles (iterable[Grid | list[int][int]]): The boards to write
+                dest (str | PathLike | file):       A path or an open text file (e.g. sys.stdout)
+                blank (str):                        The character used for empty cells
+
+        Returns:
+                (int): The number of boards written
+    """
+    if isinstance(dest, (str, PathLike)):
+        with open(dest, "w") as f:
+            return write_puzzles(puzzles, f, blank)
+
+    count = 0
+    for board in puzzles:
+        dest.write(format_puzzle(board, blank) + "\n")
+        count += 1
+    return count
@@ -0,0 +1,226 @@
+# Vectorized screening of large batches of boards with NumPy (optional dependency, only this module needs it)
+
+from dataclasses import dataclass
+from itertools import islice
+from model.grid import CELLS, Board, Grid, cells_of
+from typing import Iterable, Iterator, List
+import numpy as np
+
+DEFAULT_CHUNKSIZE = 65536  # Boards screened at a time (about 50 MB of temporary arrays)
+
+_DIGITS = np.arange(1, 10, dtype=np.uint8)
+_BITS = (1 << np.arange(1, 10)).astype(np.uint16)  # Bit d set means digit d (1-9) is a candidate, as in controller.solver
+
+
+@dataclass
+class Screen:
+    """
+    Data Class with the screening results of a batch of N boards, as returned by screen
+
+    Attributes
+    ----------
+    boards : np.ndarray
+        (N, 9, 9) uint8 array with the boards after propagation (0 for empty cells)
+    givens : np.ndarray
+        (N,) array with the number of clues of every board as given
+    valid : np.ndarray
+        (N,) bool array, False for boards whose givens clash in a row, column or box
+    broken : np.ndarray
+        (N,) bool array, True for boards with no solution: invalid givens, or a contradiction
+        found by propagation (a cell or a digit of a unit without candidates)
+    solved : np.ndarray
+        (N,) bool array, True for boards that propagation filled in completely
+    candidates : np.ndarray
+        (N, 9, 9) uint16 array with the candidate bitmask of every cell of the propagated
+        boards (bit d for digit d, 0 for filled cells)
+    """
+    boards: np.ndarray
+    givens: np.ndarray
+    valid: np.ndarray
+    broken: np.ndarray
+    solved: np.ndarray
+    candidates: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.boards)
+
+    def to_grids(self) -> List[Grid]:
+        """Function that converts the propagated boards back to Grid objects for controller.solver"""
+        return [Grid(row.tobytes()) for row in self.boards.reshape(-1, 81)]
+
+
+def load_boards(puzzles: Iterable[Board]) -> np.ndarray:
+    '''
+    Function that loads boards into a single array
+
+        Parameters:
+                puzzles (iterable[Grid | list[int][int]]): The sudoku boards
+
+        Returns:
+                (np.ndarray): (N, 9, 9) uint8 array of the boards, 0 for empty cells
+    '''
+    cells = [cells_of(b) for b in puzzles]
+    for i, board in enumerate(cells):
+        if len(board) != CELLS:
+            raise ValueError(f"Only 9x9 boards can be screened, board {i} has {len(board)} cells")
+    data = b"".join(cells)
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, 9, 9).copy()
+
+
+def check_givens(boards: np.ndarray) -> np.ndarray:
+    '''
+    Function that checks, for every board at once, that no digit appears twice in a row,
+    column or box. It is the bulk version of calling controller.solver.check_valid on
+    every given.
+
+        Parameters:
+                boards (np.ndarray): (N, 9, 9) uint8 array of boards
+
+        Returns:
+                (np.ndarray): (N,) bool array, True for the boards whose givens are consistent
+    '''
+    onehot = _onehot(boards)
+    return ~(_row_counts(onehot) > 1).any(axis=(1, 2)) \
+        & ~(_col_counts(onehot) > 1).any(axis=(1, 2)) \
+        & ~(_box_counts(onehot) > 1).any(axis=(1, 2, 3))
+
+
+def candidates(boards: np.ndarray) -> np.ndarray:
+    '''
+    Function that computes the candidate bitmask of every cell of every board at once
+
+        Parameters:
+                boards (np.ndarray): (N, 9, 9) uint8 array of boards
+
+        Returns:
+                (np.ndarray): (N, 9, 9) uint16 array, bit d set when digit d fits in the cell
+                              (0 for filled cells)
+    '''
+    return (_allowed(boards) * _BITS).sum(axis=-1, dtype=np.uint16)
+
+
+def propagate(boards: np.ndarray) -> np.ndarray:
+    '''
+    Function that fills in the naked and hidden singles of every board at once, round
+    after round, until no board changes. The boards where a contradiction shows up are
+    left as they were at that point and reported, so they can be dropped.
+
+        Parameters:
+                boards (np.ndarray): (N, 9, 9) uint8 array of boards (modified in place)
+
+        Returns:
+                (np.ndarray): (N,) bool array, True for the boards found to have no solution
+    '''
+    broken = ~check_givens(boards)
+    active = np.flatnonzero(~broken)
+    while active.size:
+        work = boards[active]
+        onehot = _onehot(work)
+        allowed = _allowed(work, onehot)
+        count = allowed.sum(axis=-1)
+        empty = work == 0
+
+        # A contradiction: an empty cell without candidates, a digit that fits nowhere in a
+        # unit, or two singles placed in the same unit by the previous round
+        present = onehot | allowed
+        dead = (empty & (count == 0)).any(axis=(1, 2)) \
+            | (_row_counts(present) == 0).any(axis=(1, 2)) \
+            | (_col_counts(present) == 0).any(axis=(1, 2)) \
+            | (_box_counts(present) == 0).any(axis=(1, 2, 3)) \
+            | (_row_counts(onehot) > 1).any(axis=(1, 2)) \
+            | (_col_counts(onehot) > 1).any(axis=(1, 2)) \
+            | (_box_counts(onehot) > 1).any(axis=(1, 2, 3))
+
+        # Naked singles (one candidate in the cell), then hidden singles (one cell for the digit in a unit)
+        hidden = allowed & ((_row_counts(allowed)[:, :, None, :] == 1)
+                            | (_col_counts(allowed)[:, None, :, :] == 1)
+                            | _expand_boxes(_box_counts(allowed) == 1))
+        forced = np.where(count == 1, allowed.argmax(axis=-1) + 1, 0)
+        forced = np.where((forced == 0) & hidden.any(axis=-1), hidden.argmax(axis=-1) + 1, forced)
+        forced = np.where(empty, forced, 0).astype(np.uint8)
+
+        changed = forced.any(axis=(1, 2)) & ~dead
+        broken[active[dead]] = True
+        work = np.where(changed[:, None, None], np.where(forced > 0, forced, work), work)
+        boards[active[changed]] = work[changed]
+        active = active[changed]
+
+    return broken
+
+
+def screen(puzzles: Iterable[Board], propagate_singles: bool = True) -> Screen:
+    '''
+    Function that screens a batch of boards in bulk: clue counts, validity of the
+    givens, singles propagation and the candidates left. Boards still open afterwards
+    can be handed to controller.solver (see Screen.to_grids).
+
+        Parameters:
+                puzzles (iterable[Grid | list[int][int]] | np.ndarray): The boards, or an (N, 9, 9) uint8 array
+                propagate_singles (bool): Fill in the naked and hidden singles (otherwise the
+                                          boards are only checked)
+
+        Returns:
+                (Screen): The screening results
+    '''
+    boards = puzzles.copy() if isinstance(puzzles, np.ndarray) else load_boards(puzzles)
+    givens = np.count_nonzero(boards, axis=(1, 2))
+    valid = check_givens(boards)
+    broken = propagate(boards) if propagate_singles else ~valid
+    solved = ~broken & (np.count_nonzero(boards, axis=(1, 2)) == 81)
+    return Screen(boards, givens, valid, broken, solved, candidates(boards))
+
+
+def iter_screen(puzzles: Iterable[Board], chunksize: int = DEFAULT_CHUNKSIZE,
+                propagate_singles: bool = True) -> Iterator[Screen]:
+    '''
+    Generator that screens a stream of boards a chunk at a time, so millions of boards
+    can go through in bounded memory
+
+        Parameters:
+                puzzles (iterable[Grid | list[int][int]]): The boards
+                chunksize (int):                          Boards screened at a time
+                propagate_singles (bool):                 Fill in the naked and hidden singles
+
+        Yields:
+                (Screen): The results of every chunk, in input order
+    '''
+    puzzles = iter(puzzles)
+    while True:
+        chunk = list(islice(puzzles, chunksize))
+        if not chunk:
+            return
+        yield screen(chunk, propagate_singles)
+
+
+def _onehot(boards: np.ndarray) -> np.ndarray:
+    """Helper function that returns the (N, 9, 9, 9) bool array of which digit is in each cell"""
+    return boards[..., None] == _DIGITS
+
+
+def _allowed(boards: np.ndarray, onehot: np.ndarray = None) -> np.ndarray:
+    """Helper function that returns the (N, 9, 9, 9) bool array of the digits fitting in each empty cell"""
+    if onehot is None:
+        onehot = _onehot(boards)
+    blocked = onehot.any(axis=2)[:, :, None, :] | onehot.any(axis=1)[:, None, :, :] \
+        | _expand_boxes(_box_counts(onehot) > 0)
+    return ~blocked & (boards == 0)[..., None]
+
+
+def _row_counts(digits: np.ndarray) -> np.ndarray:
+    """Helper function that counts, per row and digit, the cells flagged in a (N, 9, 9, 9) array"""
+    return digits.sum(axis=2, dtype=np.uint8)
+
+
+def _col_counts(digits: np.ndarray) -> np.ndarray:
+    """Helper function that counts, per column and digit, the cells flagged in a (N, 9, 9, 9) array"""
+    return digits.sum(axis=1, dtype=np.uint8)
+
+
+def _box_counts(digits: np.ndarray) -> np.ndarray:
+    """Helper function that counts, per box (band, stack) and digit, the cells flagged in a (N, 9, 9, 9) array"""
+    return digits.reshape(-1, 3, 3, 3, 3, 9).sum(axis=(2, 4), dtype=np.uint8)
+
+
+def _expand_boxes(per_box: np.ndarray) -> np.ndarray:
+    """Helper function that spreads a (N, 3, 3, 9) per box array over the (N, 9, 9, 9) cells"""
+    return per_box.repeat(3, axis=1).repeat(3, axis=2)
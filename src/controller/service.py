@@ -0,0 +1,509 @@
+# Local HTTP/JSON solving service, so several apps can share one warm pool of solver processes
+
+from collections import deque
+from controller.budget import BudgetExceeded
+from concurrent.futures import ProcessPoolExecutor
+from controller.generate import generate_board
+from controller.puzzle_io import format_puzzle, parse_puzzle
+from controller.solver import SOLVERS, count_solutions, is_consistent, solve
+from controller.stats import SolveStats
+from model.grid import CELLS, SIZES, Grid
+from typing import Deque, Dict, List, Tuple
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import time
+
+DEFAULT_HOST = "127.0.0.1"  # Only reachable from this machine
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_SIZE = 32  # Largest number of requests dispatched together
+DEFAULT_BATCH_WINDOW = 0.002  # Seconds waited for more requests before sending a batch that is not full
+DEFAULT_TIMEOUT = 5.0  # Seconds a request may take, also the largest timeout a client can ask for
+DEFAULT_MAX_NODES = 2_000_000  # Search nodes a request may use, also the largest budget a client can ask for
+MAX_COUNT_LIMIT = 1000  # Largest number of solutions /count will look for
+MAX_BODY = 1 << 16  # Largest request body accepted, in bytes
+_LATENCY_WINDOW = 1024  # Latest latencies kept per endpoint for the percentiles
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 504: "Gateway Timeout"}
+
+Response = Tuple[int, dict]  # HTTP status and JSON body
+
+
+class _Job:
+    """
+    Class modelling a request waiting for (or being run by) the worker pool
+
+    Attributes
+    ----------
+    kind : str
+        the endpoint the job comes from ("solve", "count" or "generate")
+    params : dict
+        the checked parameters of the request
+    deadline : float
+        the wall clock time (time.time()) after which the worker gives up
+    max_nodes : int
+        the number of search nodes after which the worker gives up
+    future : asyncio.Future
+        the future the response is delivered to
+    """
+
+    __slots__ = ("kind", "params", "deadline", "max_nodes", "future")
+
+    def __init__(self, kind: str, params: dict, deadline: float, max_nodes: int, future: asyncio.Future) -> None:
+        self.kind = kind
+        self.params = params
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+        self.future = future
+
+
+class SolverService:
+    """
+    Class modelling the HTTP/JSON service. Requests are parsed and checked on the event
+    loop, then queued; a dispatcher coalesces the queued requests into batches and hands
+    each batch to a pool of worker processes. The cheap jobs of a batch (solves and counts
+    on boards up to 9x9, a millisecond or so each) are split into one chunk per worker,
+    each run in a single pool call to save the trips to the workers; the others
+    (generation and larger boards) get a pool call each, so a slow one holds up no other
+    job. The workers stay warm between requests. Every search is bounded by a timeout
+    and a node budget.
+
+    Endpoints (all POST with a JSON body, except GET /metrics and GET /health):
+        /solve     {"puzzle", "engine", "timeout", "max_nodes"} -> {"status", "solution", "nodes", "elapsed_ms"}
+        /count     {"puzzle", "limit", "timeout", "max_nodes"}  -> {"status", "count", "nodes", "elapsed_ms"}
+        /generate  {"size", "clues", "seed", "unique"}           -> {"status", "puzzle", "elapsed_ms"}
+        /validate  {"puzzle"}                                    -> {"valid", "complete", "clues"}
+    The status is "solved", "unsolvable", "counted", "generated", "budget_exceeded" or "timeout".
+
+    Attributes
+    ----------
+    workers : int
+        the number of worker processes (None for the number of cores)
+    batch_size : int
+        the largest number of requests dispatched together
+    batch_window : float
+        the seconds waited for more requests before sending a batch that is not full
+    timeout : float
+        the default and largest number of seconds a request may take
+    max_nodes : int
+        the default and largest number of search nodes a request may use
+
+    Methods
+    -------
+    start(host, port):
+        starts the worker pool, the dispatcher and the server
+    serve_forever():
+        runs the server until it is cancelled
+    close():
+        stops the server and the worker pool
+    metrics():
+        returns the queue depth, request counts and latency percentiles
+    handle(method, path, body):
+        answers a single request (used by the connection handler, handy for tests)
+    """
+
+    def __init__(self, workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 batch_window: float = DEFAULT_BATCH_WINDOW, timeout: float = DEFAULT_TIMEOUT,
+                 max_nodes: int = DEFAULT_MAX_NODES) -> None:
+        """
+        Constructor function that configures the service (nothing is started yet)
+
+            Parameters:
+                    workers (int):        The number of worker processes (None for the number of cores)
+                    batch_size (int):     The largest number of requests dispatched together
+                    batch_window (float): Seconds waited for more requests before sending a batch that is not full
+                    timeout (float):      The default and largest number of seconds a request may take
+                    max_nodes (int):      The default and largest number of search nodes a request may use
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.max_nodes = max_nodes
+        self._pool = None
+        self._server = None
+        self._queue: asyncio.Queue = None
+        self._dispatcher: asyncio.Task = None
+        self._sending = set()  # Batch tasks still running, kept referenced until they finish
+        self._connections = {}  # Open connections, task -> writer, closed on shutdown
+        self._in_flight = 0
+        self._requests: Dict[str, int] = {}
+        self._statuses: Dict[str, int] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._workers = 0
+        self._batches = 0
+        self._batched_jobs = 0
+        self._pool_calls = 0
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """
+        Function that starts the worker pool, the dispatcher and the server
+
+            Parameters:
+                    host (str): The address to listen on (localhost by default)
+                    port (int): The port to listen on, 0 for any free port
+
+            Returns:
+                    (asyncio.AbstractServer): The listening server (see its sockets for the port)
+        """
+        # Workers forked from this process would inherit the listening socket and the open
+        # connections, so they come from a fork server (or are spawned) and are all started
+        # before the server, which also keeps their startup cost off the first requests
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._workers = self.workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(self._workers, mp_context=context)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _warm_up) for _ in range(self._workers)))
+
+        self._queue = asyncio.Queue()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        self._server = await asyncio.start_server(self._connection, host, port)
+        return self._server
+
+    async def serve_forever(self) -> None:
+        """Function that runs the server until it is cancelled, then shuts everything down"""
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Function that stops the server, the dispatcher and the worker pool"""
+        if self._server is not None:
+            self._server.close()
+            for writer in self._connections.values():
+                writer.close()  # Idle keep-alive connections see the end of the stream and finish
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def metrics(self) -> dict:
+        """
+        Function that returns the metrics of the service
+
+            Returns:
+                    (dict): The queue depth, the requests being run, the request and status counts,
+                            the batches and pool calls made and the latency percentiles of every endpoint
+        """
+        latency = {}
+        for endpoint, samples in self._latencies.items():
+            ordered = sorted(samples)
+            latency[endpoint] = {
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+                "p99_ms": round(ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)] * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self._in_flight,
+            "requests": dict(self._requests),
+            "statuses": dict(self._statuses),
+            "batches": self._batches,
+            "mean_batch_size": round(self._batched_jobs / self._batches, 2) if self._batches else 0.0,
+            "pool_calls": self._pool_calls,
+            "latency": latency,
+        }
+
+    async def handle(self, method: str, path: str, body: bytes) -> Response:
+        """
+        Function that answers a single request, recording its latency
+
+            Parameters:
+                    method (str): The HTTP method
+                    path (str):   The path of the request (the query string is ignored)
+                    body (bytes): The JSON body of the request
+
+            Returns:
+                    (tuple[int, dict]): The HTTP status and the JSON response
+        """
+        start = time.perf_counter()
+        endpoint = path.split("?", 1)[0].rstrip("/") or "/"
+        try:
+            status, payload = await self._route(method, endpoint, body)
+        except ValueError as e:
+            status, payload = 400, {"error": str(e)}
+
+        if status != 404:
+            self._requests[endpoint] = self._requests.get(endpoint, 0) + 1
+            key = payload.get("status", f"http_{status}")
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+            self._latencies.setdefault(endpoint, deque(maxlen=_LATENCY_WINDOW)).append(time.perf_counter() - start)
+        return status, payload
+
+    async def _route(self, method: str, endpoint: str, body: bytes) -> Response:
+        """Helper function that checks the request and sends it to its endpoint"""
+        if endpoint in ("/metrics", "/health"):
+            if method != "GET":
+                return 405, {"error": f"{endpoint} expects GET"}
+            return 200, (self.metrics() if endpoint == "/metrics" else {"status": "ok"})
+
+        if endpoint not in ("/solve", "/count", "/generate", "/validate"):
+            return 404, {"error": f"Unknown endpoint {endpoint}"}
+        if method != "POST":
+            return 405, {"error": f"{endpoint} expects POST"}
+
+        try:
+            params = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}") from None
+        if not isinstance(params, dict):
+            raise ValueError("Expected a JSON object")
+
+        if endpoint == "/validate":
+            # Cheap enough to answer on the event loop, without a trip to the workers
+            board = _puzzle(params)
+            clues = sum(1 for num in board if num)
+            return 200, {"valid": is_consistent(board), "complete": clues == len(board), "clues": clues}
+
+        timeout = min(_number(params, "timeout", self.timeout, float), self.timeout)
+        max_nodes = min(_number(params, "max_nodes", self.max_nodes, int), self.max_nodes)
+        if endpoint == "/solve":
+            engine = params.get("engine", "bitmask")
+            if not isinstance(engine, str) or engine not in SOLVERS:
+                raise ValueError(f"Unknown solver engine '{engine}', expected one of {', '.join(SOLVERS)}")
+            job = {"board": _puzzle(params), "engine": engine}
+        elif endpoint == "/count":
+            job = {"board": _puzzle(params), "limit": min(_number(params, "limit", 2, int), MAX_COUNT_LIMIT)}
+        else:
+            size = _number(params, "size", 9, int)
+            if size not in SIZES:
+                raise ValueError(f"Unsupported board size {size}, expected one of {', '.join(map(str, SIZES))}")
+            clues = params.get("clues")
+            job = {"size": size, "clues": None if clues is None else _number(params, "clues", 0, int),
+                   "seed": None if params.get("seed") is None else _number(params, "seed", 0, int),
+                   "unique": bool(params.get("unique", True))}
+
+        return await self._submit(endpoint[1:], job, timeout, max_nodes)
+
+    async def _submit(self, kind: str, params: dict, timeout: float, max_nodes: int) -> Response:
+        """Helper function that queues a job for the workers and waits for its response"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Job(kind, params, time.time() + timeout, max_nodes, future))
+        try:
+            # The workers stop searching at the deadline themselves, the margin covers the trip there and back
+            return await asyncio.wait_for(future, timeout + 1.0)
+        except asyncio.TimeoutError:
+            return 504, {"status": "timeout", "error": f"No response within {timeout} seconds"}
+
+    async def _dispatch(self) -> None:
+        """Helper coroutine that takes the queued jobs, batches them and sends each batch to the pool"""
+        while True:
+            batch = [await self._queue.get()]
+            self._drain(batch)
+            if len(batch) < self.batch_size and self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)  # Give concurrent requests a chance to join
+                self._drain(batch)
+
+            batch = [job for job in batch if not job.future.done()]  # Skip the ones that timed out waiting
+            if batch:
+                task = asyncio.create_task(self._send(batch))
+                self._sending.add(task)
+                task.add_done_callback(self._sending.discard)
+
+    def _drain(self, batch: List[_Job]) -> None:
+        """Helper function that moves queued jobs into the batch until it is full"""
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _send(self, batch: List[_Job]) -> None:
+        """Helper coroutine that runs a batch on the pool: the cheap jobs in one chunk per worker, the others alone"""
+        self._batches += 1
+        self._batched_jobs += len(batch)
+        cheap = [job for job in batch if _is_cheap(job)]
+        chunks = [cheap[i::self._workers] for i in range(min(len(cheap), self._workers))]
+        chunks += [[job] for job in batch if not _is_cheap(job)]
+        await asyncio.gather(*(self._run(chunk) for chunk in chunks))
+
+    async def _run(self, chunk: List[_Job]) -> None:
+        """Helper coroutine that runs a chunk of jobs in a single pool call and delivers their responses"""
+        self._in_flight += len(chunk)
+        self._pool_calls += 1
+        try:
+            responses = await asyncio.get_running_loop().run_in_executor(
+                self._pool, _run_jobs, [(job.kind, job.params, job.deadline, job.max_nodes) for job in chunk])
+        except Exception as e:  # The pool broke (e.g. a worker was killed)
+            responses = [(500, {"error": f"Worker failed: {e}"})] * len(chunk)
+        finally:
+            self._in_flight -= len(chunk)
+
+        for job, response in zip(chunk, responses):
+            if not job.future.done():
+                job.future.set_result(response)
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Helper coroutine that serves the requests of a connection (kept alive unless asked not to)"""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as e:
+                    _write_response(writer, 400, {"error": str(e)}, keep_alive=False)
+                    break
+                except _TooLarge as e:
+                    _write_response(writer, 413, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                status, payload = await self.handle(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+
+class _TooLarge(Exception):
+    """Exception raised when a request body is over MAX_BODY"""
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+    """
+    Helper coroutine that reads a single HTTP/1.1 request
+
+        Parameters:
+                reader (asyncio.StreamReader): The stream of the connection
+
+        Returns:
+                (tuple): The method, the path, the headers (lower case names) and the body,
+                         or None if the client closed the connection
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise ValueError("Malformed request line") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+        if len(headers) > 100:
+            raise ValueError("Too many headers")
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ValueError("Invalid Content-Length") from None
+    if length > MAX_BODY:
+        raise _TooLarge(f"Request bodies are limited to {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method.upper(), path, headers, body
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool) -> None:
+    """Helper function that writes a JSON response to the connection"""
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                 f"Content-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n"
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+
+
+def _puzzle(params: dict) -> Grid:
+    """Helper function that parses the "puzzle" parameter of a request"""
+    puzzle = params.get("puzzle")
+    if not isinstance(puzzle, str):
+        raise ValueError("Expected the puzzle as a string of 81 characters")
+    return parse_puzzle(puzzle, compact=True)
+
+
+def _number(params: dict, name: str, default, kind: type):
+    """Helper function that reads a positive, finite numeric parameter of a request"""
+    value = params.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0 \
+            or isinstance(value, float) and not math.isfinite(value):  # NaN and Infinity are valid JSON to Python
+        raise ValueError(f"Expected '{name}' to be a positive number")
+    try:
+        return kind(value)
+    except OverflowError:  # An integer too large for a float
+        raise ValueError(f"Expected '{name}' to be a positive number") from None
+
+
+def _is_cheap(job: _Job) -> bool:
+    """Helper function that tells whether a job is quick enough to share a pool call (a solve or count up to 9x9)"""
+    return job.kind != "generate" and len(job.params["board"]) <= CELLS
+
+
+def _warm_up() -> None:
+    """Helper function run once by every worker when the service starts, so the worker processes are up"""
+    time.sleep(0.05)  # Keeps the worker busy so the next warm-up call starts another one
+
+
+def _run_jobs(jobs: List[tuple]) -> List[Response]:
+    """
+    Helper function run by the workers on a chunk of jobs, one after the other (each
+    still gives up at its own deadline and node budget)
+
+        Parameters:
+                jobs (list[tuple]): The kind, parameters, deadline and node budget of every job
+
+        Returns:
+                (list[tuple[int, dict]]): The HTTP status and the JSON response of every job
+    """
+    return [_run_job(*job) for job in jobs]
+
+
+def _run_job(kind: str, params: dict, deadline: float, max_nodes: int) -> Response:
+    """
+    Helper function run by the workers on a single job, giving up once the deadline or
+    the node budget is reached
+
+        Parameters:
+                kind (str):      The endpoint of the job ("solve", "count" or "generate")
+                params (dict):   The checked parameters of the request
+                deadline (float): The wall clock time after which the search gives up
+                max_nodes (int): The number of search nodes after which the search gives up
+
+        Returns:
+                (tuple[int, dict]): The HTTP status and the JSON response
+    """
+    start = time.perf_counter()
+    if time.time() > deadline:
+        return 504, {"status": "timeout", "error": "The request waited past its deadline"}
+
+    stats = SolveStats()
+    limits = {"timeout": deadline - time.time(), "max_nodes": max_nodes}
+    try:
+        if kind == "solve":
+            board = params["board"]
+            solved = solve(board, params["engine"], stats, **limits)
+            payload = {"status": "solved" if solved else "unsolvable",
+                       "solution": format_puzzle(board) if solved else None}
+        elif kind == "count":
+            payload = {"status": "counted", "count": count_solutions(params["board"], params["limit"], stats, **limits)}
+        else:
+            board = generate_board(params["unique"], params["clues"], params["seed"], compact=True,
+                                   size=params["size"], **limits)
+            payload = {"status": "generated", "puzzle": format_puzzle(board)}
+    except BudgetExceeded as e:
+        payload = {"status": "timeout" if e.reason == "timeout" else "budget_exceeded",
+                   "error": f"Gave up after {e.nodes} nodes"}
+
+    if kind != "generate":
+        payload["nodes"] = stats.nodes
+    payload["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return 200, payload
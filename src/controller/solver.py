@@ -1,88 +1,641 @@
 # Solver file containing helper methods
 
-from typing import List, Tuple
+from controller.budget import Budget, BudgetExceeded, CancelToken, make_budget
+from controller.dlx import solve_dlx
+from controller.stats import SolveStats, measure
+from model.grid import Board, Geometry, Grid, cells_of, geometry, size_of, store_cells
+from typing import Callable, Dict, Generator, List, Tuple
 
+# A step of the search as made by BacktrackSearch.step and yielded by solve_steps: event ("place" or "remove"), (row, col), num, depth
+Step = Tuple[str, Tuple[int, int], int, int]
 
-def solve_backtrack(b: List[int]) -> bool:
+
+def solve_backtrack(b: Board, stats: SolveStats = None) -> bool:
     '''
     Function that solves a partially complete sudoku board using backtracking.
-    The algorithm recursively finds an empty cell, and for each possible
-    number (1-9) checks if the move is valid, otherwise it moves back and reverses
-    its moves.
+    The cells forced by singles are filled in first (see propagate), then the
+    empty cells are filled in row-major order, trying every possible
+    number (1-9, or up to the board size) that is a valid move, and moving
+    back to reverse the last move when a cell has none left. The search runs
+    on the explicit trail of BacktrackSearch instead of recursing.
 
         Parameters:
-                b (list[int][int]): 2D Array representing the incomplete sudoku board
+                b (Grid | list[int][int]): The incomplete sudoku board
+                stats (SolveStats): Optional object where the search statistics are added up
         
         Returns:
-                True/False (boolean): A value to stop the backtracking
+                True/False (boolean): Whether or not the board was solved (filled in place, or left
+                                      untouched if it has no solution)
     '''
-    empty_cell = find_empty(b)
-    if not empty_cell:
-        return True  # Stop backtracking, sudoku board solved
-    else:
-        row, col = empty_cell
+    cells = cells_of(b)
+    with measure(stats):
+        if propagate(b) and BacktrackSearch(b, stats).run():
+            return True
+    store_cells(b, cells)  # Undo the singles propagation filled in
+    return False
 
-    for i in range(1, 10):
-        if check_valid(b, i, (row, col)):
-            b[row][col] = i
 
-            if solve_backtrack(b):
-                return True
+class BacktrackSearch:
+    """
+    Class modelling a resumable backtracking search: empty cells are filled in row-major
+    order with the numbers tried from 1 upwards. Instead of recursing once per cell, the
+    search keeps a trail with the digits already tried in every cell it filled, so it can
+    be advanced one step at a time (see solve_steps), paused for as long as needed, or
+    run to the end. The board is kept up to date after every step.
 
-            b[row][col] = 0
+    Attributes
+    ----------
+    board : Grid | list[int][int]
+        the board being solved (filled in place)
+    stats : SolveStats
+        optional object where the search statistics are added up
+    depth : int
+        the number of cells filled by the search so far
+    trail : list[int]
+        bitmask of the digits tried so far in each cell being filled (the cell at depth d
+        is empties[d])
+    empties : list[int]
+        flat positions of the empty cells, in the order they are filled
+    done : bool
+        whether or not the search is over
+    solved : bool
+        whether or not the search found a solution
 
-    return False
+    Methods
+    -------
+    step():
+        makes the next placement or undo
+    run():
+        searches until the board is solved or shown to have no solution
+    """
+
+    def __init__(self, b: Board, stats: SolveStats = None) -> None:
+        """
+        Constructor function that sets up the search (nothing is placed yet)
+
+            Parameters:
+                    b (Grid | list[int][int]): The incomplete sudoku board
+                    stats (SolveStats): Optional object where the search statistics are added up
+        """
+        self.board = b
+        self.stats = stats
+        self.depth = 0
+        self.solved = False
+        state = _load_masks(b)
+        self.done = state is None  # The givens already break the rules
+        if state is None:
+            self.trail, self.empties = [], []
+            return
+
+        self._grid, self._rows, self._cols, self._boxes, self.empties, self._geo = state
+        self.trail = [0] * (len(self.empties) + 1)
+
+    def step(self) -> Step:
+        """
+        Function that makes the next placement, or the next undo if the current cell has
+        no numbers left. A placement is counted in stats before it is returned, an undo
+        after the board changed back.
+
+            Returns:
+                    (tuple): The event ("place" or "remove"), the (row, col) of the cell, the number
+                             and the depth of the search, None once the search is over
+        """
+        if self.done:
+            return None
+
+        geo, depth, trail = self._geo, self.depth, self.trail
+        rows, cols, boxes = self._rows, self._cols, self._boxes
+        if depth == len(self.empties):
+            self.done = self.solved = True
+            return None
 
+        pos = self.empties[depth]
+        r, c, bx = geo.row_of[pos], geo.col_of[pos], geo.box_of[pos]
+        cands = ~(rows[r] | cols[c] | boxes[bx] | trail[depth]) & geo.all_digits
+        if cands:
+            bit = cands & -cands  # Lowest number not tried yet
+            num = bit.bit_length() - 1
+            trail[depth] |= bit
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[bx] |= bit
+            self._grid[pos] = num
+            self._set(pos, num)
+            self.depth = depth + 1
+            if self.stats is not None:
+                self.stats.place((r, c), num)
+            return "place", (r, c), num, depth + 1
 
-def check_valid(b: List[int], num: int, pos: int) -> bool:
+        # No numbers left for this cell, undo the placement one level up
+        trail[depth] = 0
+        if depth == 0:
+            self.done = True
+            return None
+        depth -= 1
+        pos = self.empties[depth]
+        r, c, bx = geo.row_of[pos], geo.col_of[pos], geo.box_of[pos]
+        num = self._grid[pos]
+        if self.stats is not None:
+            self.stats.remove((r, c), num)
+        bit = 1 << num
+        rows[r] ^= bit
+        cols[c] ^= bit
+        boxes[bx] ^= bit
+        self._grid[pos] = 0
+        self._set(pos, 0)
+        self.depth = depth
+        return "remove", (r, c), num, depth + 1
+
+    def run(self) -> bool:
+        """
+        Function that runs the search from where it is until the board is solved or shown
+        to have no solution. The loop does the same moves as step, but only writes the
+        board back at the end. If stats raises (e.g. BudgetExceeded), the search is left
+        at the move it was on and can be resumed.
+
+            Returns:
+                    True/False (boolean): Whether or not the board was solved (filled in place)
+        """
+        if self.done:
+            return self.solved
+
+        geo, stats, trail, empties, grid = self._geo, self.stats, self.trail, self.empties, self._grid
+        rows, cols, boxes = self._rows, self._cols, self._boxes
+        row_of, col_of, box_of, all_digits = geo.row_of, geo.col_of, geo.box_of, geo.all_digits
+        depth, end = self.depth, len(empties)
+        try:
+            while depth < end:
+                pos = empties[depth]
+                r, c, bx = row_of[pos], col_of[pos], box_of[pos]
+                cands = ~(rows[r] | cols[c] | boxes[bx] | trail[depth]) & all_digits
+                if cands:
+                    bit = cands & -cands
+                    trail[depth] |= bit
+                    rows[r] |= bit
+                    cols[c] |= bit
+                    boxes[bx] |= bit
+                    grid[pos] = bit.bit_length() - 1
+                    depth += 1
+                    if stats is not None:
+                        stats.place((r, c), grid[pos])
+                    continue
+
+                trail[depth] = 0
+                if depth == 0:
+                    break
+                depth -= 1
+                pos = empties[depth]
+                r, c, bx = row_of[pos], col_of[pos], box_of[pos]
+                if stats is not None:
+                    stats.remove((r, c), grid[pos])
+                bit = 1 << grid[pos]
+                rows[r] ^= bit
+                cols[c] ^= bit
+                boxes[bx] ^= bit
+                grid[pos] = 0
+        finally:
+            self.depth = depth
+            store_cells(self.board, grid)
+
+        self.done = True
+        self.solved = depth == end
+        return self.solved
+
+    def _set(self, pos: int, num: int) -> None:
+        """Helper function that writes a single cell of the board"""
+        if isinstance(self.board, Grid):
+            self.board[pos] = num
+        else:
+            size = self._geo.size
+            self.board[pos // size][pos % size] = num
+
+
+def solve_steps(b: Board, stats: SolveStats = None) -> Generator[Step, None, bool]:
+    '''
+    Generator that runs the same search as solve_backtrack (empty cells in row-major order,
+    numbers tried from 1 upwards, but without filling in singles first) one step at a time,
+    on a BacktrackSearch. The search keeps its own trail instead of recursing, so it can be
+    paused between steps for as long as needed, resumed with next() and abandoned with
+    close(). The board is filled in place before every step is yielded.
+
+        Parameters:
+                b (Grid | list[int][int]): The incomplete sudoku board
+                stats (SolveStats): Optional object where the search statistics are added up
+                                    (elapsed is not measured, the search may be paused at any step)
+
+        Yields:
+                (tuple): The event ("place" or "remove"), the (row, col) of the cell, the number and
+                         the depth of the search
+
+        Returns:
+                True/False (boolean): Whether or not the board was solved, as the StopIteration value
+    '''
+    search = BacktrackSearch(b, stats)
+    step = search.step()
+    while step is not None:
+        yield step
+        step = search.step()
+    return search.solved
+
+
+def check_valid(b: Board, num: int, pos: int) -> bool:
     '''
     Function that checks whether or not a particular move is valid.
 
         Parameter:
-                b (list[int][int]): 2D array representing the sudoku board
+                b (Grid | list[int][int]): The sudoku board
                 num (int):          The number to be inserted into the cell
                 pos (tuple[int]):   The tuple representing the position of the cell (row, col)
 
         Returns:
                 True/False (bool):  Whether or not the move is valid
     '''
+    geo = geometry(size_of(b))
+    peers = geo.peers[pos[0] * geo.size + pos[1]]  # The cells sharing a row, column or box with the move
 
-    # Check Row
-    for col in range(len(b[0])):
-        # pos[0]: row position of move
-        if b[pos[0]][col] == num and pos[1] != col:
-            return False
+    if isinstance(b, Grid):
+        for p in peers:
+            if b[p] == num:
+                return False
+        return True
 
-    # Check Column
-    for row in range(len(b)):
-        if b[row][pos[1]] == num and pos[0] != row:
+    row_of, col_of = geo.row_of, geo.col_of
+    for p in peers:
+        if b[row_of[p]][col_of[p]] == num:
             return False
 
-    # Check Box
-    box_x = pos[1] // 3
-    box_y = pos[0] // 3
+    return True  # If no rules broken, valid move
 
-    for row in range(box_y*3, box_y*3 + 3):
-        for col in range(box_x*3, box_x*3 + 3):
-            if b[row][col] == num and (row, col) != pos:
-                return False
 
-    return True  # If no rules broken, valid move
+def is_consistent(b: Board) -> bool:
+    '''
+    Function that checks that no two numbers of a board clash in a row, column or box
+    (the board may still have no solution)
+
+        Parameters:
+                b (Grid | list[int][int]): The sudoku board
+
+        Returns:
+                (bool): Whether or not every number on the board is a valid move
+    '''
+    return _load_masks(b) is not None
 
 
-def find_empty(b: List[int]) -> Tuple[int]:
+def find_empty(b: Board) -> Tuple[int]:
     '''
     Function that finds an empty cell in the sudoku board
 
         Parameters:
-                b (list[int][int]): the 2d array representing the sudoku board
+                b (Grid | list[int][int]): the sudoku board
 
         Returns:
                 (row, col) (tuple[int]): Tuple representing the row and column for the empty cell
     '''
+    if isinstance(b, Grid):
+        pos = b.find(0)
+        return None if pos < 0 else divmod(pos, b.size)
+
     for row in range(len(b)):
         for col in range(len(b[0])):
             if b[row][col] == 0:  # 0 Represents an empty cell in our model
                 return (row, col)  
 
-    return None
\ No newline at end of file
+    return None
+
+
+def solve_bitmask(b: Board, stats: SolveStats = None) -> bool:
+    '''
+    Function that solves a partially complete sudoku board using backtracking over
+    candidate bitmasks. Instead of rescanning the board for every move, the digits
+    used by each row, column and box are kept as bitmasks that are updated as numbers
+    are placed and removed, and the next cell to fill is always the one with the
+    fewest candidates left (minimum remaining values).
+
+        Parameters:
+                b (Grid | list[int][int]): The incomplete sudoku board
+                stats (SolveStats): Optional object where the search statistics are added up
+
+        Returns:
+                True/False (boolean): Whether or not the board was solved (filled in place)
+    '''
+    with measure(stats):
+        state = _load_masks(b)
+        if state is None:
+            return False  # The givens already break the rules
+
+        if not _propagate(*state):
+            return False
+        if not _search_bitmask(*state, 1, stats):
+            return False
+
+    store_cells(b, state[0])
+    return True
+
+
+def count_solutions(b: Board, limit: int = 2, stats: SolveStats = None, timeout: float = None,
+                    max_nodes: int = None, cancel: CancelToken = None) -> int:
+    '''
+    Function that counts the solutions of a sudoku board, stopping as soon as limit
+    solutions have been found. With the default limit of 2 this is a uniqueness check
+    that costs about as much as a single solve.
+
+        Parameters:
+                b (Grid | list[int][int]): The incomplete sudoku board (left untouched)
+                limit (int):        The number of solutions after which to stop counting
+                stats (SolveStats): Optional object where the search statistics are added up
+                timeout (float):    Seconds the count may take, None for no limit
+                max_nodes (int):    Search nodes the count may use, None for no limit
+                cancel (CancelToken): Optional token that stops the count when cancelled
+
+        Returns:
+                (int): The number of solutions found, at most limit (raises BudgetExceeded
+                       when a limit is reached first)
+    '''
+    budget = make_budget(timeout, max_nodes, cancel)
+    if budget is not None:
+        return with_budget(lambda s: count_solutions(b, limit, s), b, stats, budget)
+
+    with measure(stats):
+        state = _load_masks(b)
+        if state is None or limit < 1 or not _propagate(*state):
+            return 0
+
+        return _search_bitmask(*state, limit, stats)
+
+
+def is_unique(b: Board) -> bool:
+    '''
+    Function that checks whether a sudoku board has exactly one solution
+
+        Parameters:
+                b (Grid | list[int][int]): The incomplete sudoku board
+
+        Returns:
+                (bool): Whether or not the board has a unique solution
+    '''
+    return count_solutions(b, 2) == 1
+
+
+def propagate(b: Board) -> bool:
+    '''
+    Function that fills in every cell forced by naked singles (a cell with one candidate
+    left) and hidden singles (a digit that fits in one cell of a row, column or box only),
+    repeating until nothing changes. None of these placements can be wrong, so the board
+    keeps the same solutions. Most newspaper puzzles are solved by this alone.
+
+        Parameters:
+                b (Grid | list[int][int]): The incomplete sudoku board (filled in place)
+
+        Returns:
+                (bool): False if the board was found to have no solution (it is then left untouched)
+    '''
+    state = _load_masks(b)
+    if state is None or not _propagate(*state):
+        return False
+
+    store_cells(b, state[0])
+    return True
+
+
+def _propagate(grid: List[int], rows: List[int], cols: List[int], boxes: List[int], empties: List[int],
+               geo: Geometry) -> bool:
+    '''
+    Helper function that applies naked and hidden singles to the bitmask state built by
+    _load_masks until nothing changes, updating all of it in place
+
+        Parameters:
+                grid (list[int]):  Flat array with the cells of the board
+                rows (list[int]):  Bitmask of the digits used in each row
+                cols (list[int]):  Bitmask of the digits used in each column
+                boxes (list[int]): Bitmask of the digits used in each box
+                empties (list[int]): Flat positions of the cells still empty
+                geo (Geometry):    The lookup tables of the board size
+
+        Returns:
+                (bool): False as soon as a contradiction shows up (a cell or a unit with no room left)
+    '''
+    row_of, col_of, box_of, unit_of, popcount = geo.row_of, geo.col_of, geo.box_of, geo.unit_of, geo.popcount
+    n, all_digits = geo.size, geo.all_digits
+    while empties:
+        # Candidates of every empty cell, and the digits seen once or more than once in each unit
+        # (rows first, then columns, then boxes)
+        cands = []
+        once, twice = [0] * (3 * n), [0] * (3 * n)
+        for pos in empties:
+            r, c, bx = unit_of[pos]
+            m = ~(rows[r] | cols[col_of[pos]] | boxes[box_of[pos]]) & all_digits
+            if not m:
+                return False
+            cands.append(m)
+            twice[r] |= once[r] & m
+            once[r] |= m
+            twice[c] |= once[c] & m
+            once[c] |= m
+            twice[bx] |= once[bx] & m
+            once[bx] |= m
+
+        # Every digit must still be placed or have room in every unit
+        for i in range(n):
+            if (once[i] | rows[i]) != all_digits or (once[n + i] | cols[i]) != all_digits \
+                    or (once[2 * n + i] | boxes[i]) != all_digits:
+                return False
+
+        forced = []
+        for pos, m in zip(empties, cands):
+            r, c, bx = unit_of[pos]
+            hidden = m & ((once[r] & ~twice[r]) | (once[c] & ~twice[c]) | (once[bx] & ~twice[bx]))
+            if hidden:
+                m = hidden
+            if popcount[m] == 1:
+                forced.append((pos, m))
+            elif hidden:
+                return False  # Two digits can only go in this one cell
+
+        if not forced:
+            return True
+
+        for pos, bit in forced:
+            r, c, bx = row_of[pos], col_of[pos], box_of[pos]
+            if (rows[r] | cols[c] | boxes[bx]) & bit:
+                return False  # Two forced placements clash
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[bx] |= bit
+            grid[pos] = bit.bit_length() - 1
+
+        empties[:] = [pos for pos in empties if not grid[pos]]
+
+    return True
+
+
+def _load_masks(b: Board) -> Tuple[list]:
+    '''
+    Helper function that builds the flat grid and the row/column/box bitmasks for a board
+    of any supported size
+
+        Parameters:
+                b (Grid | list[int][int]): The sudoku board
+
+        Returns:
+                (tuple[list]): The flat grid, the row, column and box masks, the empty cells and the
+                               Geometry of the board size, or None if two givens clash
+    '''
+    geo = geometry(size_of(b))
+    row_of, col_of, box_of, n = geo.row_of, geo.col_of, geo.box_of, geo.size
+    grid = [0] * geo.cells
+    rows, cols, boxes = [0] * n, [0] * n, [0] * n
+    empties = []
+
+    for pos, num in enumerate(cells_of(b)):
+        if num == 0:
+            empties.append(pos)
+            continue
+
+        bit = 1 << num
+        r, c, bx = row_of[pos], col_of[pos], box_of[pos]
+        if num > n or (rows[r] | cols[c] | boxes[bx]) & bit:
+            return None
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[bx] |= bit
+        grid[pos] = num
+
+    return grid, rows, cols, boxes, empties, geo
+
+
+def _search_bitmask(grid: List[int], rows: List[int], cols: List[int], boxes: List[int], empties: List[int],
+                    geo: Geometry, limit: int, stats: SolveStats = None) -> int:
+    '''
+    Recursive search used by solve_bitmask and count_solutions. The empty cell with the
+    fewest candidates is filled first, and the masks are restored on the way back up.
+    The search stops as soon as limit solutions have been found, leaving the last one
+    in grid.
+
+        Parameters:
+                grid (list[int]):  Flat array with the cells of the board
+                rows (list[int]):  Bitmask of the digits used in each row
+                cols (list[int]):  Bitmask of the digits used in each column
+                boxes (list[int]): Bitmask of the digits used in each box
+                empties (list[int]): Flat positions of the cells still empty
+                geo (Geometry):    The lookup tables of the board size
+                limit (int):       The number of solutions after which to stop
+                stats (SolveStats): Optional object where the search statistics are added up
+
+        Returns:
+                (int): The number of solutions found (at most limit)
+    '''
+    if not empties:
+        return 1  # Sudoku board solved, count it
+
+    # Find the empty cell with the minimum remaining values
+    row_of, col_of, box_of, popcount, all_digits = geo.row_of, geo.col_of, geo.box_of, geo.popcount, geo.all_digits
+    best, best_cands, best_count = 0, 0, geo.size + 1
+    for i, pos in enumerate(empties):
+        cands = ~(rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]]) & all_digits
+        count = popcount[cands]
+        if count < best_count:
+            best, best_cands, best_count = i, cands, count
+            if count <= 1:
+                break
+
+    if best_count == 0:
+        return 0  # Dead end, some cell has no candidates left
+
+    pos = empties[best]
+    empties[best] = empties[-1]
+    empties.pop()
+    r, c, bx = row_of[pos], col_of[pos], box_of[pos]
+
+    found = 0
+    while best_cands:
+        bit = best_cands & -best_cands  # Lowest candidate left
+        best_cands ^= bit
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[bx] |= bit
+        grid[pos] = bit.bit_length() - 1
+        if stats is not None:
+            stats.place((r, c), grid[pos])
+
+        found += _search_bitmask(grid, rows, cols, boxes, empties, geo, limit - found, stats)
+        if found >= limit:
+            return found
+
+        if stats is not None:
+            stats.remove((r, c), grid[pos])
+        rows[r] ^= bit
+        cols[c] ^= bit
+        boxes[bx] ^= bit
+
+    # Reverse the move and put the cell back where it was in the empties list
+    grid[pos] = 0
+    empties.append(empties[best] if best < len(empties) else pos)
+    empties[best] = pos
+    return found
+
+
+# Solver engines that can be picked at call time, all of them fill the board in place
+SOLVERS: Dict[str, Callable[[Board, SolveStats], bool]] = {
+    "backtrack": solve_backtrack,
+    "bitmask": solve_bitmask,
+    "dlx": solve_dlx,
+}
+
+
+def solve(b: Board, engine: str = "bitmask", stats: SolveStats = None, timeout: float = None,
+          max_nodes: int = None, cancel: CancelToken = None) -> bool:
+    '''
+    Function that solves a partially complete sudoku board with the selected engine,
+    optionally within a time and node budget
+
+        Parameters:
+                b (Grid | list[int][int]): The incomplete sudoku board
+                engine (str):       The name of the engine to use (see SOLVERS)
+                stats (SolveStats): Optional object where the search statistics are added up
+                timeout (float):    Seconds the search may take, None for no limit
+                max_nodes (int):    Search nodes the search may use, None for no limit
+                cancel (CancelToken): Optional token that stops the search when cancelled
+
+        Returns:
+                True/False (boolean): Whether or not the board was solved (filled in place). When a
+                                      limit is reached first, BudgetExceeded is raised and the
+                                      board is left as it was
+    '''
+    try:
+        solver = SOLVERS[engine]
+    except KeyError:
+        raise ValueError(f"Unknown solver engine '{engine}', expected one of {', '.join(SOLVERS)}") from None
+
+    budget = make_budget(timeout, max_nodes, cancel)
+    if budget is not None:
+        return with_budget(lambda s: solver(b, s), b, stats, budget)
+    return solver(b, stats)
+
+
+def with_budget(call: Callable[[SolveStats], object], b: Board, stats: SolveStats, budget: Budget):
+    '''
+    Function that runs a solver call with a budget charged on every search node. The
+    engines only count nodes through their stats argument, so one is made if needed.
+
+        Parameters:
+                call (callable):           The call, taking the stats object to pass to the engine
+                b (Grid | list[int][int]): The board of the call, restored if the budget runs out
+                stats (SolveStats):        Optional object where the search statistics are added up
+                budget (Budget):           The limits of the call
+
+        Returns:
+                (any): The result of the call (raises BudgetExceeded when a limit is reached)
+    '''
+    if stats is None:
+        stats = SolveStats()
+    outer, stats.budget = stats.budget, budget
+    cells, depth = cells_of(b), stats.depth
+    try:
+        budget.check()
+        return call(stats)
+    except BudgetExceeded:
+        store_cells(b, cells)  # The backtracking engine works on the board itself
+        stats.depth = depth  # The search was left without undoing its placements
+        raise
+    finally:
+        stats.budget = outer
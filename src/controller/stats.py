@@ -0,0 +1,102 @@
+# Data class collecting search statistics from the solver engines
+
+from contextlib import nullcontext
+from controller.budget import Budget
+from dataclasses import dataclass, field
+from typing import Callable, ContextManager, List, Tuple
+import time
+
+# Signature of the tracing hook: event ("place" or "remove"), (row, col), num, depth
+SearchHook = Callable[[str, Tuple[int, int], int, int], None]
+
+_NO_STATS = nullcontext()
+
+
+@dataclass
+class SolveStats:
+    """
+    Data Class filled in by the solver engines when passed as their stats argument.
+    Leaving stats out costs a single None check per search node.
+
+    Attributes
+    ----------
+    nodes : int
+        the number of placements tried by the search
+    backtracks : int
+        the number of placements that were undone
+    max_depth : int
+        the deepest the search went (number of placements on the stack)
+    elapsed : float
+        the time spent in the solver, in seconds
+    depth_nodes : list[int]
+        the number of placements tried at each depth (index 0 is depth 1)
+    hook : callable
+        optional function called as hook(event, (row, col), num, depth) on every placement
+        ("place") and every undo ("remove"), before the board changes back
+    budget : Budget
+        optional limits charged on every placement (see controller.budget), set by the
+        calls that take timeout, max_nodes and cancel arguments
+    depth : int
+        the current depth of the search
+    """
+    nodes: int = 0
+    backtracks: int = 0
+    max_depth: int = 0
+    elapsed: float = 0.0
+    depth_nodes: List[int] = field(default_factory=list)
+    hook: SearchHook = field(default=None, repr=False, compare=False)
+    budget: Budget = field(default=None, repr=False, compare=False)
+    depth: int = field(default=0, repr=False, compare=False)
+
+    def place(self, pos: Tuple[int, int], num: int) -> None:
+        """
+        Function called by the engines when a number is placed on the board
+
+            Parameters:
+                    pos (tuple[int]): The row and column of the cell
+                    num (int):        The number placed in the cell
+        """
+        self.nodes += 1
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+            self.depth_nodes.append(0)
+        self.depth_nodes[self.depth - 1] += 1
+        if self.hook is not None:
+            self.hook("place", pos, num, self.depth)
+        if self.budget is not None:
+            self.budget.charge()
+
+    def remove(self, pos: Tuple[int, int], num: int) -> None:
+        """
+        Function called by the engines when a placement is undone
+
+            Parameters:
+                    pos (tuple[int]): The row and column of the cell
+                    num (int):        The number being removed from the cell
+        """
+        self.backtracks += 1
+        if self.hook is not None:
+            self.hook("remove", pos, num, self.depth)
+        self.depth -= 1
+
+    def __enter__(self) -> "SolveStats":
+        self.depth = 0
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed += time.perf_counter() - self._start
+
+
+def measure(stats: SolveStats) -> ContextManager:
+    """
+    Function that returns the context manager timing a solver call
+
+        Parameters:
+                stats (SolveStats): The stats object of the call, or None
+
+        Returns:
+                (ContextManager): The stats object itself, or a no-op context when stats is None
+    """
+    return _NO_STATS if stats is None else stats
@@ -1,8 +1,10 @@
-from controller.solver import check_valid, solve_backtrack
+from controller.generate import generate_board
+from controller.solver import check_valid, count_solutions, solve_bitmask
 from model.cell import Cell
 from model.colors import Colors
-from typing import List, Tuple
-from copy import deepcopy
+from model.grid import Grid
+from math import isqrt
+from typing import List, Tuple, Union
 import pygame
 
 from model.constants import Constants
@@ -13,12 +15,12 @@ class Board:
 
     Attributes
     ----------
-    model : list[int][int]
-        the 2D array modelling the state of the Sudoku board
+    model : Grid
+        the compact grid modelling the state of the Sudoku board (nested lists are converted on assignment)
     rows : int
-        the number of rows in the Sudoku board (9)
+        the number of rows in the Sudoku board (9, or 4, 16 and 25)
     cols : int
-        the number of columns in the Sudoku board (9)
+        the number of columns in the Sudoku board (same as rows)
     width : int
         the width of the Sudoku board
     height : int
@@ -27,17 +29,25 @@ class Board:
         the row and column position of the selected cell
     cells : list[Cell][Cell]
         the 2D array containing all of the cell objects in the Sudoku board
+    solution : Grid
+        the solution of the puzzle, computed once when the model is loaded (None if it has none)
 
     Methods
     -------
+    load_solution():
+        function that solves the model once and caches its solution
     update_board():
-        function that updates the internal 2D model of the Sudoku board
+        function that rebuilds the cells of the Sudoku board from its model
     insert_num(val):
         function that inserts a number into one of the cells in the Sudoku board
     add_note(val):
         function that adds a number as a note into the selected cell of the Sudoku board
     draw(window):
         function that draws the Sudoku board onto the pygame window
+    draw_dirty(window):
+        function that redraws only the cells that changed since they were last drawn
+    draw_grid(window):
+        function that draws the grid lines of the Sudoku board
     select(row, col):
         function that selectes a particular cell in the Sudoku board
     clear():
@@ -66,8 +76,8 @@ class Board:
         Constructor function that initialises the necessary attributes for Board object
 
             Parameter:
-                    rows (int): The number of rows in the sudoku board (9)
-                    cols (int): The number of columnns in the sudoku board (9)
+                    rows (int): The number of rows in the sudoku board (9, or 4, 16 and 25)
+                    cols (int): The number of columnns in the sudoku board (same as rows)
                     width (int): The width of the sudoku board
                     height (int): The height of the sudoku board
         """
@@ -77,8 +87,9 @@ class Board:
         self._height = height
         self._selected = None
 
-        self.model = self.BOARD
-        self.cells = [[Cell(self.model[i][j], i, j, width, height) for j in range(cols)] 
+        # Other sizes start with a generated puzzle (an empty board is slow to solve at 25x25)
+        self.model = self.BOARD if rows == 9 else generate_board(compact=True, size=rows)
+        self.cells = [[Cell(self.model[i, j], i, j, width, height, rows) for j in range(cols)] 
                         for i in range(rows)]
 
     # GETTERS
@@ -103,22 +114,43 @@ class Board:
     def selected(self) -> Tuple[int]:
         return self._selected
 
+    @property
+    def model(self) -> Grid:
+        return self._model
+
+    @property
+    def solution(self) -> Grid:
+        return self._solution
+
     # SETTERS
 
     @selected.setter
     def selected(self, pos: Tuple[int]) -> None:
         self._selected = pos
 
+    @model.setter
+    def model(self, board: Union[Grid, List[List[int]]]) -> None:
+        self._model = board if isinstance(board, Grid) else Grid.from_rows(board)
+        self.load_solution()
+
     # METHODS
 
+    def load_solution(self) -> None:
+        """
+        Function that solves the model once and caches the solution, so that every move
+        can then be checked against it in constant time. It is called whenever a new model
+        is assigned, which also drops the solution of the previous puzzle.
+        """
+        solution = self.model.copy()
+        self._solution = solution if solve_bitmask(solution) else None
+        # Moves that differ from the cached solution can only be right if there is another one
+        self._unique = self._solution is not None and count_solutions(self.model, 2) == 1
+
     def update_board(self) -> None:
-        """Function that updates the 2D array model for the sudoku board"""
-        self.cells = [[Cell(self.model[i][j], i, j, self._width, self._height) for j in range(self._cols)] 
+        """Function that rebuilds the cell objects of the sudoku board from the model"""
+        self.cells = [[Cell(self.model[i, j], i, j, self._width, self._height, self._rows) for j in range(self._cols)] 
                 for i in range(self._rows)]
 
-        self.model = [[self.cells[i][j].num for j in range(self.cols)]
-                for i in range(self.rows)]
-
 
     def insert_num(self, val: int) -> bool:
         """
@@ -133,23 +165,26 @@ class Board:
         row, col = self.selected  # Get the position of the selected cell
         # If the cell is currently empty
         if self.cells[row][col].num == 0:
-            # Update the number of the cell and the model
-            self.cells[row][col].num = val
-            self.update_board()
-
-            old_model = deepcopy(self.model)  # Save current state of the model
-
-            # If the move is valid (check using the backtracking algorithm), move is ok
-            if check_valid(self.model, val, (row, col)) and solve_backtrack(self.model):
-                # Clear the model, then return (so visualization still works)
-                self.model = old_model
-                return True
-            # If the move is not valid, bring cell back to default and update the model again
+            # The move is ok if it matches the cached solution. If the puzzle has more than one
+            # solution, any move that can still be completed is ok and its solution is cached instead
+            if self.solution is not None and self.solution[row, col] == val:
+                valid = True
+            elif self.solution is not None and not self._unique and check_valid(self.model, val, (row, col)):
+                trial = self.model.copy()
+                trial[row, col] = val
+                valid = solve_bitmask(trial)
+                if valid:
+                    self._solution = trial
+            else:
+                valid = False
+
+            # Update the number of the cell and the model, or bring the cell back to default
+            if valid:
+                self.cells[row][col].num = val
+                self.model[row, col] = val
             else:
-                self.cells[row][col].num = 0
                 self.cells[row][col].tempNum = 0
-                self.update_board()
-                return False
+            return valid
 
     def add_note(self, val: int) -> None:
         """
@@ -168,13 +203,52 @@ class Board:
             Parameters:
                     window (pygame.display): The pygame window to be drawn to
         """
+        self.draw_grid(window)
+
+        # Draw each cell, for each cell in the board
+        for i in range(self.rows):
+            for j in range(self.cols):
+                self.cells[i][j].draw(window)
+
+    def draw_dirty(self, window: pygame.display) -> List[pygame.Rect]:
+        """
+        Function that only redraws the cells that changed since they were last drawn. Each
+        cell is cleared and redrawn together with the grid lines crossing it, clipped to its area.
 
-        # Draw grid lines
-        gap = self.width / 9  # The size of the cells
+            Parameters:
+                    window (pygame.display): The pygame window to be drawn to
+
+            Returns:
+                    (list[pygame.Rect]): The areas of the window that were redrawn
+        """
+        rects = []
+        for i in range(self.rows):
+            for j in range(self.cols):
+                cell = self.cells[i][j]
+                if cell.dirty:
+                    rect = cell.rect
+                    window.set_clip(rect)
+                    window.fill(Colors.WHITE)
+                    self.draw_grid(window)
+                    cell.draw(window)
+                    rects.append(rect)
+
+        window.set_clip(None)
+        return rects
+
+    def draw_grid(self, window: pygame.display) -> None:
+        """
+        Function that draws the grid lines of the board
+
+            Parameters:
+                    window (pygame.display): The pygame window to be drawn to
+        """
+        gap = self.width / self.cols  # The size of the cells
+        box = isqrt(self.rows)  # The number of rows and columns in a box
         # For each of the rows in the sudoku board (1-9)...
         for i in range(self.rows + 1):
             # If it is one of the box rows, make the line thicker
-            if i % 3 == 0 and i != 0:
+            if i % box == 0 and i != 0:
                 thickness = 4
             else:
                 thickness = 1
@@ -183,11 +257,6 @@ class Board:
             pygame.draw.line(window, Colors.BLACK, (0, i*gap + Constants.Y_OFFSET), (self.width, i*gap + Constants.Y_OFFSET), thickness)
             pygame.draw.line(window, Colors.BLACK, (i*gap, Constants.Y_OFFSET), (i*gap, self.height+Constants.Y_OFFSET), thickness)
 
-        # Draw each cell, for each cell in the board
-        for i in range(self.rows):
-            for j in range(self.cols):
-                self.cells[i][j].draw(window)
-
     def select(self, row: int, col: int) -> None:
         """
         Function that selects a cell in the board by setting the appropriate flag
@@ -197,10 +266,9 @@ class Board:
                     col (int): The column position of the cell
         """
 
-        # Reset all other cells
-        for i in range(self.rows):
-            for j in range(self.cols):
-                self.cells[i][j].selected = False
+        # Reset the cell selected before (no other cell can be selected)
+        if self.selected is not None:
+            self.cells[self.selected[0]][self.selected[1]].selected = False
 
         # Set the current cell as selected and save its position
         self.cells[row][col].selected = True
@@ -223,7 +291,7 @@ class Board:
                     (tuple[int]): The x and y position of the start of the cell that was clicked
         """
         if pos[0] < self.width and pos[1] < self.height and pos[1] > Constants.Y_OFFSET:
-            gap = self.width / 9
+            gap = self.width / self.cols
             x = pos[0] // gap
             y = (pos[1] - Constants.Y_OFFSET) // gap
             return (int(y), int(x))
@@ -238,9 +306,5 @@ class Board:
             Returns:
                     (bool): Whether or not the board is full/game has finished
         """
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if self.cells[i][j].num == 0:
-                    return False
-        return True
+        return 0 not in self.model  # The model is filled together with the cells
             
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import Tuple
 from model.colors import Colors
 from model.constants import Constants
+from model.fonts import render_text
 import pygame
 
 class Button:
@@ -21,13 +22,19 @@ class Button:
         the rgb color of the default background color for button
     hovered_bg : tuple[int]
         the rgb color of the hovered button
+    dirty : bool
+        whether or not the hover state changed since the button was last drawn
+    rect : pygame.Rect
+        the area of the window covered by the button
 
     Methods
     -------
     draw(window):
-        the draw method to display the button object on screen (called on every frame)
+        the draw method to display the button object on screen
     click():
         the method that checks whether the button has been pressed (called on every frame)
+    hovered():
+        the method that checks whether the mouse is over the button
     """
 
     def __init__(self, text: str, pos: Tuple[int], size: Tuple[int], font: str, bg: Tuple[int], hovered_bg: Tuple[int]) -> None:
@@ -43,38 +50,65 @@ class Button:
                     hovered_bg (tuple[int]): the rgb color of the hovered button background
         """
         self._x, self._y = pos 
-        self._font = pygame.font.SysFont(font, Constants.BTN_FONT_SIZE)
-        self._font.bold = True  # Set the font to bold by default
+        self._font = font
         self._text = text
         self._size = size
-        self._surface = pygame.Surface(size)
         self._bgcolor = bg  # Button color
         self._hoveredColor = hovered_bg  # Button color for hover effect
+        self._drawnHovered = None  # Hover state the button was last drawn with (None if never drawn)
+        # The button only ever looks one of two ways, so both are rendered up front
+        self._surfaces = {False: self._render(bg), True: self._render(hovered_bg)}
 
-    def draw(self, window: pygame.display):
+    def _render(self, color: Tuple[int]) -> pygame.Surface:
         """
-        Function that draws the button object to the pygame window
+        Helper function that renders the button with its text on a background color
 
             Parameters:
-                    window (pygame.display): the pygame window object
-        """
+                    color (tuple[int]): the rgb color of the button background
 
-        x, y = pygame.mouse.get_pos()
-        
-        if (x >= self._x and x <= self._x + self._size[0]) and \
-            (y >= self._y and y <= self._y + self._size[1]):
-            # The mouse is inside the button, so hover color
-            self._surface.fill(self._hoveredColor)
-        else:
-            self._surface.fill(self._bgcolor)
+            Returns:
+                    (pygame.Surface): the surface with the rendered button
+        """
+        surface = pygame.Surface(self._size)
+        surface.fill(color)
 
         text_lines = self._text.splitlines()
         for i, l in enumerate(text_lines):
-            font_text = self._font.render(l, 1, Colors.BLACK)
-            self._surface.blit(font_text, (self._size[0]/2 - font_text.get_size()[0] / 2, 
-                                           self._size[1]/2 - font_text.get_size()[1] + Constants.BTN_FONT_SIZE * i))
+            font_text = render_text(l, Colors.BLACK, Constants.BTN_FONT_SIZE, self._font, bold=True)
+            surface.blit(font_text, (self._size[0]/2 - font_text.get_size()[0] / 2, 
+                                     self._size[1]/2 - font_text.get_size()[1] + Constants.BTN_FONT_SIZE * i))
+        return surface
+
+    @property
+    def dirty(self) -> bool:
+        return self.hovered() != self._drawnHovered
+
+    @property
+    def rect(self) -> pygame.Rect:
+        return pygame.Rect((self._x, self._y), self._size)
+
+    def hovered(self) -> bool:
+        """
+        Function that checks whether the mouse is over the button
+
+            Returns:
+                    (bool): whether or not the mouse is inside the button
+        """
+        x, y = pygame.mouse.get_pos()
+        return (x >= self._x and x <= self._x + self._size[0]) and \
+               (y >= self._y and y <= self._y + self._size[1])
+
+    def draw(self, window: pygame.display):
+        """
+        Function that draws the button object to the pygame window
+
+            Parameters:
+                    window (pygame.display): the pygame window object
+        """
 
-        window.blit(self._surface, (self._x, self._y))
+        # If the mouse is inside the button, use the hover color
+        self._drawnHovered = self.hovered()
+        window.blit(self._surfaces[self._drawnHovered], (self._x, self._y))
 
     def click(self):
         """
@@ -2,6 +2,8 @@ import pygame
 
 from model.colors import Colors
 from model.constants import Constants
+from model.fonts import render_text
+from model.grid import SIZE, SYMBOLS
 
 class Cell:
     """
@@ -15,14 +17,22 @@ class Cell:
         the row position of the cell (1-9)
     col : int
         the column position of the cell (1-9)
+    size : int
+        the number of rows and columns of the board (9)
     bWidth : int
         the width of the Sudoku board
     bHeight : int
         the height of the Sudoku board
+    fontSize : int
+        the font size of the numbers, scaled with the cell so they fit on larger boards
     tempNum : int
         the temporary number added as a note to the cell
     selected : bool
         whether or not the cell is selected
+    dirty : bool
+        whether or not the cell changed since it was last drawn
+    rect : pygame.Rect
+        the area of the window covered by the cell
 
     Methods
     -------
@@ -30,9 +40,7 @@ class Cell:
         Draws the cell's contents to the pygame window
     """
 
-    ROWS, COLS = 9, 9
-
-    def __init__(self, num: int, row: int, col: int, boardWidth: int, boardHeight: int) -> None:
+    def __init__(self, num: int, row: int, col: int, boardWidth: int, boardHeight: int, size: int = SIZE) -> None:
         """
         Constructs necessary attributes for Cell object
 
@@ -42,17 +50,21 @@ class Cell:
                     col (int): The col (1-9) position of the cell
                     boardWidth (int): The width of the board object
                     boardHeight (int): The height of the board object
+                    size (int): The number of rows and columns of the board
         """
         self.__row = row
         self.__col = col
         self.__bWidth = boardWidth
         self.__bHeight = boardHeight
+        self.__size = size
+        self.__fontSize = max(round(Constants.FONT_SIZE * SIZE / size), 1)  # FONT_SIZE fits the cells of a 9x9 board
         self._num = num
         self._tempNum = 0
         self._selected = False
         # Used for visualization of backtracking algo
         self._correct = False  
         self._incorrect = False
+        self._dirty = True  # Not drawn yet
 
     # GETTERS
 
@@ -76,27 +88,52 @@ class Cell:
     def incorrect(self) -> bool:
         return self._incorrect
 
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    @property
+    def rect(self) -> pygame.Rect:
+        padding = self.__bWidth / self.__size
+        return pygame.Rect(round(self.__col * padding), round(self.__row * padding + Constants.Y_OFFSET),
+                           round(padding), round(padding))
+
     # SETTERS
+    # Every setter marks the cell as dirty when the value actually changes
 
     @num.setter
     def num(self, val: int) -> None:
-        self._num = val
+        if val != self._num:
+            self._num = val
+            self._dirty = True
 
     @tempNum.setter
     def tempNum(self, val: int) -> None:
-        self._tempNum = val
+        if val != self._tempNum:
+            self._tempNum = val
+            self._dirty = True
 
     @selected.setter
     def selected(self, val: int) -> None:
-        self._selected = val
+        if val != self._selected:
+            self._selected = val
+            self._dirty = True
 
     @correct.setter
     def correct(self, val: bool) -> None:
-        self._correct = val
+        if val != self._correct:
+            self._correct = val
+            self._dirty = True
 
     @incorrect.setter
     def incorrect(self, val: bool) -> None:
-        self._incorrect = val
+        if val != self._incorrect:
+            self._incorrect = val
+            self._dirty = True
 
 
     def draw(self, window: pygame.display) -> None:
@@ -106,9 +143,7 @@ class Cell:
             Parameter:
                     window (pygame.display Object): The pygame window
         """
-        fnt = pygame.font.SysFont(Constants.FONT, Constants.FONT_SIZE)
-
-        padding = self.__bWidth / 9  # The cell padding will be board width div by 9
+        padding = self.__bWidth / self.__size  # The cell padding will be board width div by 9 (the board size)
         x = self.__col * padding 
         y = self.__row * padding + Constants.Y_OFFSET
 
@@ -120,12 +155,14 @@ class Cell:
 
         # If it is a temporary number, show it in grey and left aligned
         if self.tempNum != 0 and self.num == 0:
-            text = fnt.render(str(self.tempNum), 1, Colors.GREY)
+            text = render_text(SYMBOLS[self.tempNum - 1], Colors.GREY, self.__fontSize)
             window.blit(text, (x+5, y+5))
         # If it is a permanent number, show it in black and centered
         elif not(self.num == 0):
-            text = fnt.render(str(self.num), 1, Colors.BLACK)
+            text = render_text(SYMBOLS[self.num - 1], Colors.BLACK, self.__fontSize)
             window.blit(text, (x + (padding/2 - text.get_width()/2), y + (padding/2 - text.get_height()/2)))
 
         if self.selected:
             pygame.draw.rect(window, Colors.RED, (x, y, padding, padding), 4)
+
+        self._dirty = False
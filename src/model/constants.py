@@ -25,6 +25,16 @@ class Constants:
         the font size used for button text
     Y_OFFSET : int
         the amount (in px) the board is displaced down
+    HUD_HEIGHT : int
+        the height (in px) of the strip at the bottom showing the time and strikes
+    FPS : int
+        the maximum number of frames drawn per second
+    SOLVE_SPEED : int
+        the number of search steps the visualizer shows per frame when it starts
+    MAX_SOLVE_SPEED : int
+        the largest number of search steps the visualizer can be sped up to per frame
+    PREFETCH_DEPTH : int
+        the number of generated boards kept ready for the generate button
     """
 
     APP_TITLE = "SudoPy"
@@ -35,4 +45,9 @@ class Constants:
     WIN_HEIGHT = WIN_DIMENS[1]
     FONT_SIZE = 30
     BTN_FONT_SIZE = 20
-    Y_OFFSET = 150  # The y position at which the board is drawn
\ No newline at end of file
+    Y_OFFSET = 150  # The y position at which the board is drawn
+    HUD_HEIGHT = 40
+    FPS = 30
+    SOLVE_SPEED = 1
+    MAX_SOLVE_SPEED = 1024
+    PREFETCH_DEPTH = 3
\ No newline at end of file
@@ -0,0 +1,47 @@
+# Cache of the fonts and rendered text shared by the cells, the buttons and the GUI
+
+from functools import lru_cache
+from model.constants import Constants
+from typing import Tuple
+import pygame
+
+TEXT_CACHE_SIZE = 512  # Rendered strings kept around (the numbers of each board size in every color, and the HUD texts)
+
+
+@lru_cache(maxsize=None)
+def get_font(size: int = Constants.FONT_SIZE, name: str = Constants.FONT, bold: bool = False) -> pygame.font.Font:
+    """
+    Function that returns the font for a name, size and weight, resolving it with
+    pygame.font.SysFont only the first time it is asked for
+
+        Parameters:
+                size (int):  The font size
+                name (str):  The name of the system font
+                bold (bool): Whether or not the font is bold
+
+        Returns:
+                (pygame.font.Font): The shared font object (must not be modified)
+    """
+    font = pygame.font.SysFont(name, size)
+    font.bold = bold
+    return font
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text: str, color: Tuple[int], size: int = Constants.FONT_SIZE, name: str = Constants.FONT,
+                bold: bool = False) -> pygame.Surface:
+    """
+    Function that returns the rendered surface of a string, rendering it only the first
+    time it is asked for with the same font, size, weight and color
+
+        Parameters:
+                text (str):         The text to render
+                color (tuple[int]): The rgb color of the text
+                size (int):         The font size
+                name (str):         The name of the system font
+                bold (bool):        Whether or not the font is bold
+
+        Returns:
+                (pygame.Surface): The shared surface with the text (must not be modified)
+    """
+    return get_font(size, name, bold).render(text, 1, color)
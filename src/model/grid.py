@@ -0,0 +1,235 @@
+# Compact board representation shared by the solver, the generator and the Board
+
+from functools import lru_cache
+from math import isqrt
+from typing import Iterable, List, Sequence, Tuple, Union
+
+SIZE = 9  # Number of rows and columns in the classic board
+CELLS = SIZE * SIZE
+SIZES = (4, 9, 16, 25)  # Board sizes supported (boxes of 2x2 up to 5x5)
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"  # Character of every number when written out, 10 and up as letters
+
+_SIZE_OF = {size * size: size for size in SIZES}  # Board size for each number of cells
+
+
+class Grid(bytearray):
+    """
+    Class modelling a sudoku board as a flat array of bytes in row order (81 for the
+    classic 9x9 board, size * size in general), 0 meaning an empty cell. A Grid is a
+    single object (instead of the 10 lists of the nested list format), copying it is a
+    single memcpy and it can be hashed, so it can be used as a dictionary key. The hash
+    follows the contents, so a Grid must not be changed while it is stored in a set or
+    dictionary.
+
+    Cells can be indexed by flat position (row * size + col) or by a (row, col) tuple.
+
+    Attributes
+    ----------
+    size : int
+        the number of rows and columns of the board (9 for the classic board)
+
+    Methods
+    -------
+    from_rows(rows):
+        builds a Grid from the nested list format
+    to_rows():
+        converts the Grid to the nested list format
+    copy():
+        returns an independent copy of the Grid
+    """
+
+    __slots__ = ()
+
+    def __init__(self, cells: Iterable[int] = None, size: int = SIZE) -> None:
+        """
+        Constructor function that initialises the cells of the Grid
+
+            Parameters:
+                    cells (iterable[int]): The numbers of the board in row order (bytes, another
+                                           Grid or any iterable), leave out for an empty board
+                    size (int):            The size of the empty board (ignored when cells are given)
+        """
+        super().__init__(size * size if cells is None else cells)
+        if len(self) not in _SIZE_OF:
+            raise ValueError(f"Expected {', '.join(str(n * n) for n in SIZES)} cells, got {len(self)}")
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[int]]) -> "Grid":
+        """
+        Function that builds a Grid from a board in the nested list format
+
+            Parameters:
+                    rows (list[int][int]): 2D array representing the sudoku board
+
+            Returns:
+                    (Grid): The same board as a Grid
+        """
+        return cls(num for row in rows for num in row)
+
+    @property
+    def size(self) -> int:
+        return _SIZE_OF[len(self)]
+
+    def to_rows(self) -> List[List[int]]:
+        """
+        Function that converts the Grid to the nested list format
+
+            Returns:
+                    (list[int][int]): 2D array representing the sudoku board
+        """
+        size = self.size
+        return [list(bytearray.__getitem__(self, slice(i, i + size))) for i in range(0, len(self), size)]
+
+    def copy(self) -> "Grid":
+        """Function that returns an independent copy of the Grid"""
+        return Grid(self)
+
+    def __getitem__(self, pos: Union[int, slice, Tuple[int, int]]) -> int:
+        if type(pos) is tuple:
+            pos = pos[0] * _SIZE_OF[len(self)] + pos[1]
+        return bytearray.__getitem__(self, pos)
+
+    def __setitem__(self, pos: Union[int, slice, Tuple[int, int]], num: int) -> None:
+        if type(pos) is tuple:
+            pos = pos[0] * _SIZE_OF[len(self)] + pos[1]
+        bytearray.__setitem__(self, pos, num)
+
+    def __hash__(self) -> int:
+        return hash(bytes(self))
+
+    def __reduce__(self) -> tuple:
+        return Grid, (bytes(self),)  # Picklable for the worker processes of the batch API
+
+    def __str__(self) -> str:
+        return "".join(SYMBOLS[num - 1] if num else "." for num in self)
+
+    def __repr__(self) -> str:
+        return f"Grid('{self}')"
+
+
+Board = Union[Grid, List[List[int]]]  # Either of the formats accepted by the solver and the generator
+
+
+def cells_of(b: Board) -> bytes:
+    """
+    Function that returns the cells of a board in either format as a flat snapshot
+
+        Parameters:
+                b (Grid | list[int][int]): The sudoku board
+
+        Returns:
+                (bytes): The numbers of the board in row order
+    """
+    if isinstance(b, Grid):
+        return bytes(b)
+    return bytes(num for row in b for num in row)
+
+
+def store_cells(b: Board, cells: Sequence[int]) -> None:
+    """
+    Function that writes flat cells back into a board in either format, in place
+
+        Parameters:
+                b (Grid | list[int][int]): The sudoku board to fill
+                cells (sequence[int]):     The numbers in row order
+    """
+    if isinstance(b, Grid):
+        b[:] = bytes(cells)
+        return
+    size = len(b)
+    for row in range(size):
+        b[row][:] = cells[row * size:(row + 1) * size]
+
+
+def size_of(b: Board) -> int:
+    """
+    Function that returns the number of rows and columns of a board in either format
+
+        Parameters:
+                b (Grid | list[int][int]): The sudoku board
+
+        Returns:
+                (int): The size of the board (9 for the classic board)
+    """
+    return b.size if isinstance(b, Grid) else len(b)
+
+
+class Geometry:
+    """
+    Class modelling the lookup tables of a board size, shared by the solver engines and
+    the generator so none of them has the size hardcoded. Use geometry(size) to get the
+    (cached) tables of a size.
+
+    Attributes
+    ----------
+    size : int
+        the number of rows, columns and boxes, and of digits
+    box : int
+        the number of rows and columns of a box (3 for the classic board)
+    cells : int
+        the number of cells
+    row_of, col_of, box_of : tuple[int]
+        the row, column and box of every flat cell position
+    rows, cols, boxes : tuple[tuple[int]]
+        the flat cell positions of every row, column and box
+    units : tuple[tuple[int]]
+        the rows, then the columns, then the boxes
+    unit_of : tuple[tuple[int]]
+        the index in units of the row, column and box of every flat cell position
+    peers : tuple[tuple[int]]
+        the flat positions of the cells sharing a unit with every cell (20 on the classic board)
+    all_digits : int
+        the bitmask with every digit set (bit d for digit d, bit 0 unused)
+    popcount : tuple[int]
+        the number of bits set in every mask up to all_digits (indexed like a tuple)
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Constructor function that builds the tables of a board size
+
+            Parameters:
+                    size (int): The number of rows and columns (one of SIZES)
+        """
+        if size not in SIZES:
+            raise ValueError(f"Unsupported board size {size}, expected one of {', '.join(map(str, SIZES))}")
+        box = isqrt(size)
+        self.size = size
+        self.box = box
+        self.cells = size * size
+        self.row_of = tuple(i // size for i in range(self.cells))
+        self.col_of = tuple(i % size for i in range(self.cells))
+        self.box_of = tuple((i // (size * box)) * box + (i % size) // box for i in range(self.cells))
+        self.rows = tuple(tuple(r * size + c for c in range(size)) for r in range(size))
+        self.cols = tuple(tuple(r * size + c for r in range(size)) for c in range(size))
+        self.boxes = tuple(tuple(i for i in range(self.cells) if self.box_of[i] == b) for b in range(size))
+        self.units = self.rows + self.cols + self.boxes
+        self.unit_of = tuple((self.row_of[i], size + self.col_of[i], 2 * size + self.box_of[i])
+                             for i in range(self.cells))
+        self.peers = tuple(tuple(sorted({p for u in self.unit_of[i] for p in self.units[u]} - {i}))
+                           for i in range(self.cells))
+        self.all_digits = (1 << (size + 1)) - 2
+        # A table is the fastest way to count bits, but 25 digits would need 64M entries
+        self.popcount = tuple(bin(m).count("1") for m in range(self.all_digits + 1)) if size <= 16 else _BitCount()
+
+
+class _BitCount:
+    """Class standing in for a popcount table too large to build, counting the bits on lookup"""
+
+    def __getitem__(self, mask: int) -> int:
+        return bin(mask).count("1")
+
+
+@lru_cache(maxsize=None)
+def geometry(size: int = SIZE) -> Geometry:
+    """
+    Function that returns the lookup tables of a board size, building them only the
+    first time they are asked for
+
+        Parameters:
+                size (int): The number of rows and columns of the board
+
+        Returns:
+                (Geometry): The shared tables (must not be modified)
+    """
+    return Geometry(size)
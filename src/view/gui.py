@@ -3,8 +3,9 @@
 from model.board import Board
 from model.button import Button
 from model.colors import Colors
+from model.fonts import render_text
 from controller.solver import *
-from controller.generate import generate_board
+from controller.prefetch import PuzzleQueue
 import pygame
 import time
 
@@ -14,12 +15,27 @@ class GUI:
     """
     Class modelling the GUI for the app
 
+    Attributes
+    ----------
+    speed : int
+        the number of search steps the visualizer shows per frame
+    solving : bool
+        whether or not the visualizer is running (paused or not)
+
     Methods
     -------
-    auto_solve(window, board, time, strikes):
-        visualizer function that animates the backtracking algorithm
+    auto_solve(board):
+        function that starts the backtracking visualizer, or pauses/resumes it
+    step_solve(board):
+        function that advances the visualizer by one frame worth of search steps
+    cancel_solve(board):
+        function that stops the visualizer and clears the numbers it placed
     redraw_window(window, board, time, strikes):
-        function that updates the display in each frame
+        function that redraws and updates the whole display
+    redraw_dirty(window, board, time, strikes):
+        function that updates only the parts of the display that changed (called in each frame)
+    draw_hud(window, time, strikes):
+        function that draws the time and the strikes at the bottom of the window
     format_time(secs):
         helper function to format the time as provided by time module
     main():
@@ -28,54 +44,94 @@ class GUI:
 
     RUN = True
 
-    def auto_solve(self, window: pygame.display, board: Board, time: time.time, strikes: int, buttons: Tuple[Button]) -> None:
+    def __init__(self) -> None:
+        """Constructor function that initialises the state used to track what needs redrawing"""
+        self._hud = None  # The time and strikes currently shown on screen
+        self.speed = Constants.SOLVE_SPEED
+        self._steps = None  # The step generator of the search being visualized
+        self._solving = None  # The copy of the model the visualized search fills in
+        self._paused = False
+        self._removed = None  # Cell shown in red with its undone number until the next step
+
+    @property
+    def solving(self) -> bool:
+        return self._steps is not None
+
+    def auto_solve(self, board: Board) -> None:
         """
-        Visualizer function that animates the backtracking algorithm
+        Visualizer function that animates the backtracking algorithm. The search runs on
+        solve_steps over a copy of the model, and is advanced a few steps in every frame
+        by step_solve, so the window keeps responding. Called while the visualizer is
+        running, it pauses or resumes it.
 
             Parameters:
-                    window (pygame.display): the pygame window
                     board (Board): the board object
-                    time (time.time): the play time
-                    strike (int): number of strikes the user has
-            
-            Returns:
-                    (bool): flag indicating whether or not a particular moves yields a potential solution
         """
+        if self.solving:
+            self._paused = not self._paused
+            return
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                GUI.RUN = False
-                return True  # Exit this loop (solution is to end program)
-        
-        empty_cell = find_empty(board.model)
-        if not empty_cell:
-            return True  # Stop backtracking, sudoku board solved
-        else:
-            row, col = empty_cell
-
-        for i in range(1, 10):
-            if check_valid(board.model, i, (row, col)):
-                board.cells[row][col].num = i
-                board.model[row][col] = i
-                board.cells[row][col].incorrect = False
-                board.cells[row][col].correct = True
-                pygame.time.delay(50)
-                self.redraw_window(window, board, time, strikes, buttons)
-
-                if self.auto_solve(window, board, time, strikes, buttons):
-                    return True
-
-                board.cells[row][col].incorrect = True
-                board.cells[row][col].correct = False
-                self.redraw_window(window, board, time, strikes, buttons)
-                pygame.time.delay(50)
-                board.cells[row][col].num = 0
-                board.model[row][col] = 0
+        self._solving = board.model.copy()
+        self._steps = solve_steps(self._solving)
+        self._paused = False
+
+    def step_solve(self, board: Board) -> None:
+        """
+        Function that advances the visualizer by speed steps (called in each frame). Every
+        placement is shown in green, every undo in red.
+
+            Parameters:
+                    board (Board): the board object
+        """
+        if not self.solving or self._paused:
+            return
+
+        for _ in range(self.speed):
+            if self._removed is not None:
+                self._removed.num = 0
+                self._removed = None
+
+            try:
+                event, (row, col), num, depth = next(self._steps)
+            except StopIteration as done:
+                if done.value:
+                    board.model[:] = self._solving  # Same puzzle, so the cached solution still holds
+                self._steps = None
+                return
 
+            cell = board.cells[row][col]
+            if event == "place":
+                cell.num = num
+                cell.incorrect = False
+                cell.correct = True
+            else:
+                cell.incorrect = True
+                cell.correct = False
+                self._removed = cell
+
+    def cancel_solve(self, board: Board) -> None:
+        """
+        Function that stops the visualizer and clears the numbers and colors it left on the board
+
+            Parameters:
+                    board (Board): the board object
+        """
+        if not self.solving:
+            return
+
+        self._steps.close()
+        self._steps = None
+        self._removed = None
+        for i in range(board.rows):
+            for j in range(board.cols):
+                if board.model[i, j] == 0:
+                    board.cells[i][j].num = 0
+                    board.cells[i][j].correct = False
+                    board.cells[i][j].incorrect = False
 
     def redraw_window(self, window: pygame.display, board: Board, time: time.time, strikes: int, buttons: Tuple[Button]) -> None:
         """
-        Function that redraws the window with all the updated information after interaction
+        Function that redraws the whole window with all the updated information
 
             Parameters:
                     window (pygame.display): The window object as supplied by pygame
@@ -84,13 +140,7 @@ class GUI:
                     strikes (int): The number of strikes the user has
         """
         window.fill(Colors.WHITE)  # Clear screen
-        # Draw time
-        fnt = pygame.font.SysFont(Constants.FONT, Constants.FONT_SIZE)
-        text = fnt.render("Time: " + self.format_time(time), 1, Colors.BLACK)
-        window.blit(text, (Constants.WIN_WIDTH-270, Constants.WIN_HEIGHT - 40))
-        # Draw strikes
-        text = fnt.render("X " * strikes, 1, Colors.RED)
-        window.blit(text, (20, Constants.WIN_HEIGHT - 40))
+        self.draw_hud(window, time, strikes)
         # Draw grid and board
         board.draw(window)
         # Draw buttons
@@ -98,6 +148,53 @@ class GUI:
             button.draw(window)
         pygame.display.update()
 
+    def redraw_dirty(self, window: pygame.display, board: Board, time: time.time, strikes: int, buttons: Tuple[Button]) -> None:
+        """
+        Function that redraws only the cells, buttons and time/strikes that changed since they
+        were last drawn, and updates just those areas of the display. Nothing is drawn when
+        nothing changed.
+
+            Parameters:
+                    window (pygame.display): The window object as supplied by pygame
+                    board (Board): The board object
+                    time (time.time): The current time as provided by time
+                    strikes (int): The number of strikes the user has
+        """
+        rects = board.draw_dirty(window)
+        for button in buttons:
+            if button.dirty:
+                button.draw(window)
+                rects.append(button.rect)
+        if self._hud != (time, strikes):
+            rects.append(self.draw_hud(window, time, strikes))
+
+        if rects:
+            pygame.display.update(rects)
+
+    def draw_hud(self, window: pygame.display, time: time.time, strikes: int) -> pygame.Rect:
+        """
+        Function that draws the time and the strikes in the strip at the bottom of the window
+
+            Parameters:
+                    window (pygame.display): The window object as supplied by pygame
+                    time (time.time): The current time as provided by time
+                    strikes (int): The number of strikes the user has
+
+            Returns:
+                    (pygame.Rect): The area of the window that was drawn
+        """
+        rect = pygame.Rect(0, Constants.WIN_HEIGHT - Constants.HUD_HEIGHT, Constants.WIN_WIDTH, Constants.HUD_HEIGHT)
+        window.fill(Colors.WHITE, rect)
+        # Draw time
+        text = render_text("Time: " + self.format_time(time), Colors.BLACK)
+        window.blit(text, (Constants.WIN_WIDTH-270, Constants.WIN_HEIGHT - 40))
+        # Draw strikes
+        text = render_text("X " * strikes, Colors.RED)
+        window.blit(text, (20, Constants.WIN_HEIGHT - 40))
+
+        self._hud = (time, strikes)
+        return rect
+
     def format_time(self, secs: int) -> str:
         """
         Helper function that formats the time received by time module
@@ -124,12 +221,17 @@ class GUI:
         key = None  # The key pressed
         start = time.time()  # The starting time upon opening the app
         strikes = 0  # The number of strikes the user has
+        clock = pygame.time.Clock()  # Caps the frame rate so the loop sleeps between frames
+        puzzles = PuzzleQueue(Constants.PREFETCH_DEPTH).start()  # Boards generated in the background
 
         # Instantiate both buttons
         generateSudokuBtn = Button("GENERATE SUDOKU\nBOARD", (20, 50), (230, 75), Constants.FONT, Colors.BOARD_BUTTON_BG, Colors.BOARD_BUTTON_HOVER)
         autoSolveSudokuBtn = Button("AUTO SOLVE\nBOARD", (Constants.WIN_WIDTH - 250, 50), (230, 75), Constants.FONT, Colors.SOLVE_BUTTON_BG, Colors.SOLVE_BUTTON_HOVER)
 
+        self.redraw_window(window, board, 0, strikes, (generateSudokuBtn, autoSolveSudokuBtn))
+
         while GUI.RUN:
+            clock.tick(Constants.FPS)
 
             play_time = round(time.time() - start)  # The time elapsed since the game started, recalculated every frame
 
@@ -160,11 +262,17 @@ class GUI:
                     if event.key == pygame.K_DELETE or event.key == pygame.K_BACKSPACE:
                         board.clear()
                         key = None
-                    # Running visualization logic
+                    # Running visualization logic (SPACE starts/pauses, ESCAPE cancels, +/- change the speed)
                     if event.key == pygame.K_SPACE:
-                        self.auto_solve(window, board, play_time, strikes, [generateSudokuBtn, autoSolveSudokuBtn])
+                        self.auto_solve(board)
+                    if event.key == pygame.K_ESCAPE:
+                        self.cancel_solve(board)
+                    if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                        self.speed = min(self.speed * 2, Constants.MAX_SOLVE_SPEED)
+                    if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        self.speed = max(self.speed // 2, 1)
                     # Committing number to cell logic
-                    if event.key == pygame.K_RETURN:
+                    if event.key == pygame.K_RETURN and not self.solving:
                         i, j = board.selected
                         if board.cells[i][j].tempNum != 0:
                             if board.insert_num(board.cells[i][j].tempNum):
@@ -188,14 +296,13 @@ class GUI:
                         if button.click():  # If the buttons have been clicked
 
                             if button == generateSudokuBtn:
-                                new_board = generate_board()  # Create a new board
+                                self.cancel_solve(board)
+                                new_board = puzzles.get()  # Take a ready board (a new one is generated behind it)
                                 board.model = new_board  # Update the model being used by the board
                                 board.update_board()
-                                self.redraw_window(window, board, play_time, strikes, (generateSudokuBtn, autoSolveSudokuBtn))
-                                pygame.display.update()              
                                 
                             elif button == autoSolveSudokuBtn:
-                                self.auto_solve(window, board, play_time, strikes, [generateSudokuBtn, autoSolveSudokuBtn])
+                                self.auto_solve(board)
 
                     clicked = board.click(pos)
                     if clicked:
@@ -212,7 +319,9 @@ class GUI:
                 print("Game Over")
                 GUI.RUN = False
 
-            # Redraw the window in each frame and update the pygame display
-            self.redraw_window(window, board, play_time, strikes, (generateSudokuBtn, autoSolveSudokuBtn))
-            pygame.display.update()               
-                    
\ No newline at end of file
+            self.step_solve(board)
+
+            # Redraw whatever changed in this frame and update those areas of the pygame display
+            self.redraw_dirty(window, board, play_time, strikes, (generateSudokuBtn, autoSolveSudokuBtn))
+                    
+        puzzles.stop()